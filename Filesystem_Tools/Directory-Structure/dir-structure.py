@@ -18,9 +18,12 @@ Features:
 - Provides JSON output support.
 - Measures execution time and logs metadata at the top of the output file.
 - Supports colorized terminal output for better readability.
+- Reuses unchanged folders from a snapshot (--snapshot) and reports changes since the last run.
+  A folder only counts as changed when entries are added, removed or renamed in it, so a file
+  rewritten in place keeps its old size until its folder changes or a run without --snapshot.
 
 Usage:
-    python directory_structure.py <directory_path> [--exclude folder1 folder2 --json]
+    python directory_structure.py <directory_path> [--exclude "node_modules/" "*.tmp" --exclude-from rules.txt --json]
 
 Example:
     python directory_structure.py "/Users/YourName/Music"
@@ -34,117 +37,702 @@ Output:
         └── 📄 smooth_jazz.mp3 (2.15 MB)
 """
 import os
+import re
+import sys
 import time
+import gzip
 import json
+import shutil
 import argparse
+import tempfile
 from datetime import datetime
+from contextlib import contextmanager
+from collections import Counter
 from tqdm import tqdm  # Progress bar
 from colorama import Fore, Style
+from concurrent.futures import ThreadPoolExecutor
 
-def get_directory_tree(root_directory, output_file, exclude=None, json_output=False):
-    """Retrieve the directory structure recursively and write it to a file in ASCII format with a progress bar."""
-    start_time = time.time()  # Start timing the script execution
-    current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Get current date/time
-    exclude = set(exclude) if exclude else set()  # Convert exclude list to a set for fast lookup
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+from fswalk import ExcludeRules, list_directory  # Shared scandir-based walker (Filesystem_Tools/fswalk.py)
 
-    def generate_tree(folder, prefix="", use_colors=True):
-        """Recursively generate the ASCII tree structure."""
-        entries = sorted(os.listdir(folder))  # Sort for consistent order
-        entries = [e for e in entries if not e.startswith(".") and e not in exclude]  # Filter hidden & excluded items
+LISTING_QUEUE_PER_JOB = 8  # Folders listed ahead per --jobs thread before the walk catches up
+SNAPSHOT_VERSION = 2  # Bump when the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_COMPRESSION = 5  # gzip level of snapshot files
 
-        folder_entries = [e for e in entries if os.path.isdir(os.path.join(folder, e))]
-        file_entries = [e for e in entries if os.path.isfile(os.path.join(folder, e))]
-        total_entries = len(folder_entries) + len(file_entries)
+class TreeNode:
+    """
+    One scanned entry. Type, size and mtime come from the scandir listing, so rendering never touches the disk again.
+    `children` holds the sorted subfolders followed by the sorted files (None for files and folders that were not scanned,
+    or whose listing was not kept), and `folder_count`/`file_count` are set once a folder is listed.
+    """
+    __slots__ = ("name", "is_dir", "size", "mtime_ns", "children", "folder_count", "file_count")
 
-        if total_entries == 0:
-            return [f"{prefix}⚠️ This folder is empty\n"]
+    def __init__(self, name, is_dir, size=0, mtime_ns=0, children=None):
+        self.name = sys.intern(name)  # Repeated names (e.g. "Disc 1", "cover.jpg") share one string
+        self.is_dir = is_dir
+        self.size = size
+        self.mtime_ns = mtime_ns
+        self.children = children
+        self.folder_count = None
+        self.file_count = None
 
-        lines = []
-        progress_bar.update(1)  # Update progress bar for each folder processed
+def node_from_entry(entry, is_dir):
+    """Builds a TreeNode from a DirEntry, reusing its cached stat where the platform provides one."""
+    try:
+        entry_stat = entry.stat()
+        return TreeNode(entry.name, is_dir, 0 if is_dir else entry_stat.st_size, entry_stat.st_mtime_ns)
+    except OSError:
+        return TreeNode(entry.name, is_dir)  # Entry vanished or is unreadable
 
-        # Iterate through folders
-        for index, entry in enumerate(folder_entries):
-            is_last = index == (len(folder_entries) + len(file_entries)) - 1
-            connector = "└── " if is_last else "├── "
-            entry_path = os.path.join(folder, entry)
+def subfolder_info(entry):
+    """Returns (path, is symlink, (device, inode) or None) for a subfolder DirEntry, from its cached stat."""
+    try:
+        folder_stat = entry.stat()
+        return entry.path, entry.is_symlink(), (folder_stat.st_dev, folder_stat.st_ino)
+    except OSError:
+        return entry.path, entry.is_symlink(), None
+
+def list_folder(folder, rules=None, relative_path=""):
+    """
+    Lists one folder (one scandir, sorted, without hidden entries or entries matched by the ExcludeRules) and stats
+    every entry; excluded folders are therefore never entered.
+    This is the only step that touches the disk, so --jobs runs it on worker threads.
+
+    :return: Tuple of (subfolder_info() of each subfolder, TreeNodes for the subfolders followed by the files).
+    """
+    folder_entries, file_entries = list_directory(folder, include_hidden=False, sort=True, rules=rules,
+                                                  relative_path=relative_path)
+    children = [node_from_entry(entry, True) for entry in folder_entries]
+    children += [node_from_entry(entry, False) for entry in file_entries]
+    return [subfolder_info(entry) for entry in folder_entries], children
+
+def reuse_folder(folder, rows):
+    """
+    Rebuilds a folder listing from snapshot rows (see TreeSnapshot) instead of listing it again.
+    Only the subfolders are stat'ed, since their own modification times decide whether they can be reused too.
+
+    :return: Same as list_folder().
+    """
+    subfolders, children = [], []
+    for name, kind, size, mtime_ns in rows:
+        if kind == "f":
+            children.append(TreeNode(name, False, size, mtime_ns))
+            continue
+
+        path = os.path.join(folder, name)
+        try:
+            folder_stat = os.stat(path)
+            subfolders.append((path, kind == "l", (folder_stat.st_dev, folder_stat.st_ino)))
+            children.append(TreeNode(name, True, 0, folder_stat.st_mtime_ns))
+        except OSError:
+            subfolders.append((path, kind == "l", None))
+            children.append(TreeNode(name, True))
+    return subfolders, children
+
+def is_parent_folder(folder_id, parents):
+    """Checks a (device, inode) pair against a chain of parent folders built by walk_tree()."""
+    while parents is not None:
+        if parents[0] == folder_id:
+            return True
+        parents = parents[1]
+    return False
+
+def walk_tree(root_directory, rules=None, max_depth=None, max_entries=None, progress_bar=None, root=None, jobs=1,
+              snapshot=None, on_listing=None):
+    """
+    Streams a directory tree as render-ready lines, listing each folder (one scandir) when the walk reaches it
+    (before its own line is yielded, so folder nodes already carry their child counts).
+    An explicit stack replaces recursion, and only the folders on the current path are held in memory.
+
+    - Symlinked folders are entered unless they point back to one of their own parent folders (a link loop).
+    - With jobs > 1, the subfolders of each listed folder are listed ahead on worker threads (bounded by
+      LISTING_QUEUE_PER_JOB per job), so network round trips overlap; lines are still yielded in sorted order.
+    - With a snapshot, folders whose modification time has not changed are rebuilt from it instead of listed.
+
+    :param root_directory: Directory to walk.
+    :param rules: Optional ExcludeRules; excluded folders are never entered.
+    :param max_depth: Deepest folder level to list (1 = only the root's contents); None for no limit.
+    :param max_entries: Entries shown per folder before the rest are summarized; None for no limit.
+    :param progress_bar: Optional tqdm bar, advanced once per folder listed.
+    :param root: Optional TreeNode for the root; if given, every listing is kept on its node (see scan_tree())
+                 instead of being dropped once rendered.
+    :param jobs: Number of threads listing folders.
+    :param snapshot: Optional TreeSnapshot of an earlier scan with the same rules.
+    :param on_listing: Optional callback(relative path, node, subfolders, children, reused), called in walk order
+                       for every folder listed or reused (see list_folder() for subfolders and children).
+    :return: Iterator of (prefix, connector, item, relative path) where item is a TreeNode, or a marker message
+             (with a relative path of None).
+    """
+    root_stat = os.stat(root_directory)
+    keep_nodes = root is not None
+    if root is None:
+        root = TreeNode(os.path.basename(os.path.normpath(root_directory)), True, 0, root_stat.st_mtime_ns)
+    # One frame per folder on the current path: [children, subfolder info, prefix, depth, parent chain,
+    # relative path, index of the next child, index of the next subfolder to list ahead]
+    stack = []
+    executor = ThreadPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    prefetched = {}  # Folder path -> future of list_folder(), for folders the walk has not reached yet
+
+    def read_folder(folder, relative_path, mtime_ns):
+        """Returns (subfolders, children, reused) from the snapshot if the folder is unchanged, else lists it."""
+        rows = snapshot.lookup(relative_path, mtime_ns) if snapshot is not None else None
+        if rows is not None:
+            return reuse_folder(folder, rows) + (True,)
+        return list_folder(folder, rules, relative_path) + (False,)
+
+    def prefetch_subfolders():
+        """Starts listing the subfolders the walk will enter next (deepest frame first), while the queue has room."""
+        for frame in reversed(stack):
+            children, subfolders, depth, relative_path = frame[0], frame[1], frame[3], frame[5]
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            limit = len(subfolders) if max_entries is None else min(len(subfolders), max_entries)
+            while frame[7] < limit:
+                if len(prefetched) >= jobs * LISTING_QUEUE_PER_JOB:
+                    return
+                path, is_link, folder_id = subfolders[frame[7]]
+                child = children[frame[7]]
+                frame[7] += 1
+                # Links are checked for loops when the walk reaches them, and unreadable folders are never entered
+                if not is_link and folder_id is not None:
+                    prefetched[path] = executor.submit(read_folder, path, os.path.join(relative_path, child.name),
+                                                       child.mtime_ns)
+
+    def leave_folder():
+        """Pops the current frame and drops listings started for any of its subfolders the walk did not enter."""
+        frame = stack.pop()
+        if prefetched:
+            for path, _, _ in frame[1][:frame[7]]:
+                future = prefetched.pop(path, None)
+                if future is not None:
+                    future.cancel()
+
+    def enter_folder(node, folder, prefix, depth, parents, relative_path):
+        """Lists a folder and pushes its frame; returns a marker message if there is nothing to descend into."""
+        try:
+            future = prefetched.pop(folder, None)
+            subfolders, children, reused = (future.result() if future is not None
+                                            else read_folder(folder, relative_path, node.mtime_ns))
+        except OSError:
+            return "⚠️ This folder was not scanned (unreadable or a link loop)"
+
+        node.folder_count = len(subfolders)
+        node.file_count = len(children) - len(subfolders)
+        if keep_nodes:
+            node.children = children
+        if progress_bar is not None:
+            progress_bar.update(1)
+        if on_listing is not None:
+            on_listing(relative_path, node, subfolders, children, reused)
+
+        if children:
+            stack.append([children, subfolders, prefix, depth, parents, relative_path, 0, 0])
+        if executor is not None:
+            prefetch_subfolders()
+        return None if children else "⚠️ This folder is empty"
+
+    try:
+        marker = enter_folder(root, root_directory, "", 1, ((root_stat.st_dev, root_stat.st_ino), None), "")
+        if marker:
+            yield "", "", marker, None
 
-            folder_name = f"{Fore.BLUE}📂 {entry}/{Style.RESET_ALL}" if use_colors else f"📂 {entry}/"
-            lines.append(f"{prefix}{connector}{folder_name}")
+        while stack:
+            frame = stack[-1]
+            children, subfolders, prefix, depth, parents, folder_path, index = frame[:7]
+            if index >= len(children):
+                leave_folder()
+                continue
+            frame[6] += 1
+            child = children[index]
 
-            new_prefix = prefix + ("    " if is_last else "│   ")
-            lines.extend(generate_tree(entry_path, new_prefix, use_colors))
+            if max_entries is not None and index >= max_entries:
+                yield prefix, "└── ", f"… {len(children) - index} more entries", None
+                leave_folder()
+                continue
 
-        # Iterate through files
-        for index, entry in enumerate(file_entries):
-            is_last = index == len(file_entries) - 1
+            is_last = index == len(children) - 1
             connector = "└── " if is_last else "├── "
-            entry_path = os.path.join(folder, entry)
-            file_size = os.path.getsize(entry_path) / (1024 * 1024)  # Convert to MB
+            child_path = os.path.join(folder_path, child.name)
 
-            # Convert to GB if file size > 1024MB
-            if file_size > 1024:
-                file_size = file_size / 1024
-                size_label = f"{file_size:.2f} GB"
+            # Subfolders come first, so their info shares the child's index
+            if not child.is_dir or (max_depth is not None and depth >= max_depth):
+                yield prefix, connector, child, child_path
+                continue
+
+            path, is_link, folder_id = subfolders[index]
+            frame[7] = max(frame[7], index + 1)  # Listed below if it was not listed ahead
+            child_prefix = prefix + ("    " if is_last else "│   ")
+
+            if folder_id is None or (is_link and is_parent_folder(folder_id, parents)):
+                marker = "⚠️ This folder was not scanned (unreadable or a link loop)"
             else:
-                size_label = f"{file_size:.2f} MB"
+                marker = enter_folder(child, path, child_prefix, depth + 1, (folder_id, parents), child_path)
+
+            yield prefix, connector, child, child_path
+            if marker:
+                yield child_prefix, "", marker, None
+    finally:
+        if executor is not None:
+            executor.shutdown(cancel_futures=True)
+
+def scan_tree(root_directory, rules=None, max_depth=None, progress_bar=None, jobs=1):
+    """
+    Scans a directory tree once (one scandir per folder) into TreeNodes held in memory.
+
+    :param root_directory: Directory to scan.
+    :param rules: Optional ExcludeRules; excluded folders are never entered.
+    :param max_depth: Deepest folder level to list; None for no limit.
+    :param progress_bar: Optional tqdm bar, advanced once per folder listed.
+    :param jobs: Number of threads listing folders.
+    :return: TreeNode for the root directory.
+    """
+    root = TreeNode(os.path.basename(os.path.normpath(root_directory)), True, 0, os.stat(root_directory).st_mtime_ns)
+    for _ in walk_tree(root_directory, rules, max_depth, progress_bar=progress_bar, root=root, jobs=jobs):
+        pass
+    sum_folder_sizes(root)
+    return root
+
+def sum_folder_sizes(root):
+    """Sets the size of every scanned folder node to the total size of the files below it."""
+    folders, pending = [], [root]
+    while pending:
+        node = pending.pop()
+        if node.children is not None:
+            folders.append(node)
+            pending.extend(child for child in node.children if child.is_dir)
+
+    # Parents were collected before their subfolders, so walking backwards sums the deepest folders first
+    for node in reversed(folders):
+        node.size = sum(child.size for child in node.children)
+
+def format_mtime(mtime_ns):
+    """Formats a modification time (ns since the epoch) as a local ISO-8601 timestamp."""
+    return datetime.fromtimestamp(mtime_ns / 1e9).isoformat(timespec="seconds")
+
+def node_record(node, relative_path=None):
+    """
+    Returns the JSON fields of a node, keyed by name for nested JSON or by relative path for NDJSON.
+    Folder sizes are totals from sum_folder_sizes(); NDJSON records are written before the total is known, so it is null.
+    """
+    size = None if node.is_dir and relative_path is not None else node.size
+    record = {"name": node.name} if relative_path is None else {"path": relative_path}
+    record.update(type="folder" if node.is_dir else "file", size=size, mtime=format_mtime(node.mtime_ns))
+    if node.is_dir:
+        record.update(folders=node.folder_count, files=node.file_count)
+    return record
+
+def write_json_tree(root, stream):
+    """
+    Writes a scanned tree as nested JSON: every node has name, type, size (bytes), mtime and, for folders,
+    the number of subfolders and files plus their `children` (null if the folder was not scanned).
+    Written iteratively, one node per line, so very deep trees do not hit the recursion limit.
+    """
+    def open_folder(node, indent):
+        stream.write(indent + json.dumps(node_record(node), ensure_ascii=False)[:-1] + ', "children": [')
+
+    if not root.children:
+        stream.write(json.dumps({**node_record(root), "children": root.children}, ensure_ascii=False) + "\n")
+        return
+
+    open_folder(root, "")
+    stack = [[iter(root.children), "    ", True]]  # [children iterator, indent, no child written yet]
+
+    while stack:
+        frame = stack[-1]
+        child = next(frame[0], None)
+        if child is None:
+            stack.pop()
+            stream.write(f"\n{frame[1][:-4]}]}}")
+            continue
+
+        stream.write("\n" if frame[2] else ",\n")
+        frame[2] = False
+        if child.is_dir and child.children:
+            open_folder(child, frame[1])
+            stack.append([iter(child.children), frame[1] + "    ", True])
+        else:
+            record = node_record(child)
+            if child.is_dir:
+                record["children"] = child.children  # [] if empty, None if not scanned
+            stream.write(frame[1] + json.dumps(record, ensure_ascii=False))
+    stream.write("\n")
+
+def format_size(size):
+    """Formats a size in bytes as MB, converting to GB above 1024 MB."""
+    file_size = size / (1024 * 1024)  # Convert to MB
+
+    # Convert to GB if file size > 1024MB
+    if file_size > 1024:
+        return f"{file_size / 1024:.2f} GB"
+    return f"{file_size:.2f} MB"
+
+def format_line(prefix, connector, item, use_colors=True):
+    """Formats one line yielded by walk_tree() as ASCII tree text, optionally colored."""
+    if isinstance(item, str):
+        return f"{prefix}{connector}{item}"
+
+    if item.is_dir:
+        folder_name = f"📂 {item.name}/"
+        return f"{prefix}{connector}{Fore.BLUE}{folder_name}{Style.RESET_ALL}" if use_colors else f"{prefix}{connector}{folder_name}"
+
+    file_label = f"📄 {item.name} ({format_size(item.size)})"
+    return f"{prefix}{connector}{Fore.GREEN}{file_label}{Style.RESET_ALL}" if use_colors else f"{prefix}{connector}{file_label}"
+
+class TreeSnapshot:
+    """
+    Compact record of an earlier scan: for every listed folder, its modification time and its rows
+    (name, kind "d"/"l"/"f" for folder/symlinked folder/file, size, mtime_ns).
 
-            file_entry = f"{Fore.GREEN}📄 {entry} ({size_label}){Style.RESET_ALL}" if use_colors else f"📄 {entry} ({size_label})"
-            lines.append(f"{prefix}{connector}{file_entry}")
+    Stored gzip-compressed, one tab-separated line per folder ("mtime_ns<TAB>json path<TAB>json rows") after a JSON
+    header. Rows are kept as raw JSON text and only parsed for folders that are reused or compared.
+    """
 
-        return lines
+    def __init__(self, header, folders):
+        self.header = header
+        self._folders = folders  # Relative path -> (mtime_ns, raw JSON rows)
 
-    # Get total folders for progress bar
-    total_folders = sum(len(dirs) for _, dirs, _ in os.walk(root_directory))
-    global progress_bar
-    progress_bar = tqdm(total=total_folders, desc="Scanning Directories", unit="folder", dynamic_ncols=True)
+    @classmethod
+    def load(cls, snapshot_path):
+        """Reads a snapshot written by SnapshotWriter."""
+        folders = {}
+        with gzip.open(snapshot_path, "rt", encoding="utf-8") as snapshot_file:
+            header = json.loads(snapshot_file.readline())
+            if header.get("version") != SNAPSHOT_VERSION:
+                raise ValueError(f"unsupported snapshot version {header.get('version')}")
+            for line in snapshot_file:
+                mtime_ns, relative_path, rows = line.rstrip("\n").split("\t", 2)
+                folders[json.loads(relative_path)] = (int(mtime_ns), rows)
+        return cls(header, folders)
 
-    # Generate tree structure with colors for terminal output
-    tree_structure_colored = generate_tree(root_directory, use_colors=True)
+    def rows(self, relative_path):
+        """Returns the recorded rows of a folder, or None if it was not listed in the snapshot."""
+        folder = self._folders.get(relative_path)
+        return None if folder is None else json.loads(folder[1])
 
-    # Generate tree structure without colors for file output
-    tree_structure_plain = generate_tree(root_directory, use_colors=False)
+    def lookup(self, relative_path, mtime_ns):
+        """Returns the recorded rows of a folder if its modification time is unchanged, else None."""
+        folder = self._folders.get(relative_path)
+        if folder is None or folder[0] != mtime_ns:
+            return None
+        return json.loads(folder[1])
 
-    progress_bar.close()  # Close progress bar when done
+    def iter_subtree(self, relative_path):
+        """Yields (relative path, kind, size) for everything recorded below a folder, one folder's rows at a time."""
+        pending = [relative_path]
+        while pending:
+            folder = pending.pop()
+            rows = self.rows(folder) or []
+            for name, kind, size, _ in rows:
+                yield os.path.join(folder, name), kind, size
+            pending.extend(os.path.join(folder, name) for name, kind, _, _ in reversed(rows) if kind != "f")
 
-    end_time = time.time()  # Stop timing execution
-    execution_time = end_time - start_time  # Calculate elapsed time
+class SnapshotWriter:
+    """
+    Writes a TreeSnapshot while walk_tree() runs (pass add() as its on_listing callback).
+    The file is written next to the target and only replaces it once the scan has finished.
+    """
 
-    # Write to file (without color formatting)
-    with open(output_file, "w", encoding="utf-8") as f:
-        f.write("📂 Directory Structure Report\n")
-        f.write("Generated by: Directory Structure Generator\n")
-        f.write("Author: yung-megafone\n")
-        f.write(f"Generated on: {current_date}\n")
-        f.write(f"Execution Time: {execution_time:.2f} seconds\n")
-        f.write("-" * 50 + "\n\n")  # Separator
-        f.write(f"📂 {os.path.basename(root_directory)}/\n")
-        f.write("\n".join(tree_structure_plain) + "\n")
+    def __init__(self, snapshot_path, root_directory, rules, max_depth=None, max_entries=None):
+        self.snapshot_path = snapshot_path
+        self._temporary_path = f"{snapshot_path}.tmp"
+        self._file = gzip.open(self._temporary_path, "wt", encoding="utf-8", compresslevel=SNAPSHOT_COMPRESSION)
+        header = snapshot_settings(root_directory, rules, max_depth, max_entries)
+        header.update({"version": SNAPSHOT_VERSION, "created": datetime.now().isoformat(timespec="seconds")})
+        self._file.write(json.dumps(header, ensure_ascii=False) + "\n")
+
+    def add(self, relative_path, node, subfolders, children, reused):
+        """Records one folder listing (same arguments as the on_listing callback of walk_tree())."""
+        rows = []
+        for index, child in enumerate(children):
+            kind = ("l" if subfolders[index][1] else "d") if child.is_dir else "f"
+            rows.append((child.name, kind, child.size, child.mtime_ns))
+        self._file.write(f"{node.mtime_ns}\t{json.dumps(relative_path, ensure_ascii=False)}\t"
+                         f"{json.dumps(rows, ensure_ascii=False, separators=(',', ':'))}\n")
+
+    def commit(self):
+        """Closes the snapshot and moves it into place."""
+        self._file.close()
+        os.replace(self._temporary_path, self.snapshot_path)
+
+    def discard(self):
+        """Closes and deletes an unfinished snapshot."""
+        self._file.close()
+        os.remove(self._temporary_path)
+
+class TreeDiff:
+    """
+    Compares every folder that was listed again (modification time changed) with its rows in the previous
+    snapshot and streams a report of added, removed, grown and shrunk entries (pass compare() as on_listing).
+    """
+
+    def __init__(self, snapshot, stream):
+        self.snapshot = snapshot
+        self.stream = stream
+        self.counts = Counter()
+        self.size_delta = 0
+        self._new_folders = set()  # Folders reported as added; everything listed inside them is new too
+
+    def _report(self, change, relative_path, size, delta):
+        """Writes one report line; `size` is the current (or removed) size and `delta` the change in bytes."""
+        self.counts[change] += 1
+        self.size_delta += delta
+        if change in ("grown", "shrunk"):
+            detail = f" {delta:+,} bytes ({format_size(size - delta)} → {format_size(size)})"
+        else:
+            detail = f" ({format_size(size)})" if size else ""
+        self.stream.write(f"{change.upper():<8} {relative_path}{detail}\n")
+
+    def compare(self, relative_path, node, subfolders, children, reused):
+        """Reports the changes in one folder (same arguments as the on_listing callback of walk_tree())."""
+        if reused:
+            return  # Unchanged modification time, so the snapshot rows were used as they are
+
+        is_new = relative_path in self._new_folders
+        self._new_folders.discard(relative_path)
+        old_rows = None if is_new else self.snapshot.rows(relative_path)
+        if old_rows is None and not is_new:
+            return  # Not listed in the previous scan (e.g. beyond --max-depth), so there is nothing to compare
+
+        old_entries = {name: (kind != "f", size) for name, kind, size, _ in old_rows or ()}
+        for child in children:
+            child_path = os.path.join(relative_path, child.name)
+            old_entry = old_entries.pop(child.name, None)
+
+            if old_entry is None or old_entry[0] != child.is_dir:
+                if old_entry is not None:
+                    self._report_removed(child_path, *old_entry)
+                self._report("added", child_path + (os.sep if child.is_dir else ""), child.size, child.size)
+                if child.is_dir:
+                    self._new_folders.add(child_path)
+            elif not child.is_dir and child.size != old_entry[1]:
+                change = "grown" if child.size > old_entry[1] else "shrunk"
+                self._report(change, child_path, child.size, child.size - old_entry[1])
+
+        for name, (was_dir, size) in sorted(old_entries.items()):
+            self._report_removed(os.path.join(relative_path, name), was_dir, size)
+
+    def _report_removed(self, relative_path, was_dir, size):
+        if not was_dir:
+            self._report("removed", relative_path, size, -size)
+            return
+
+        self._report("removed", relative_path + os.sep, 0, 0)
+        for path, kind, old_size in self.snapshot.iter_subtree(relative_path):
+            self._report("removed", path + (os.sep if kind != "f" else ""), old_size, -old_size)
+
+    def summary(self):
+        """Returns a one-line summary of the changes found."""
+        return (f"{self.counts['added']} added, {self.counts['removed']} removed, {self.counts['grown']} grown, "
+                f"{self.counts['shrunk']} shrunk ({self.size_delta:+,} bytes)")
+
+def snapshot_settings(root_directory, rules, max_depth=None, max_entries=None):
+    """Returns the scan settings a snapshot depends on; a snapshot is only reused by a run with the same settings."""
+    return {"root": os.path.abspath(root_directory), "exclude": rules.patterns, "include": rules.include,
+            "max_depth": max_depth, "max_entries": max_entries}
+
+def load_snapshot(snapshot_path, root_directory, rules, max_depth=None, max_entries=None):
+    """
+    Loads the previous snapshot, or returns None if there is none or it cannot be used for this run.
+    A snapshot of another root, or taken with other rules or limits, is ignored: its folders could
+    otherwise be reused for the wrong tree, or a limited scan could hide changes from a full one.
+    """
+    if not os.path.isfile(snapshot_path):
+        return None
+    try:
+        snapshot = TreeSnapshot.load(snapshot_path)
+    except (OSError, ValueError) as e:
+        print(f"{Fore.YELLOW}⚠ Ignoring snapshot {snapshot_path}:{Style.RESET_ALL} {e}")
+        return None
+
+    labels = {"root": "of a different directory", "exclude": "with different exclude/include rules",
+              "include": "with different exclude/include rules", "max_depth": "with a different --max-depth",
+              "max_entries": "with a different --max-entries-per-dir"}
+    for key, expected in snapshot_settings(root_directory, rules, max_depth, max_entries).items():
+        if snapshot.header.get(key) != expected:
+            print(f"{Fore.YELLOW}⚠ Ignoring snapshot {snapshot_path}:{Style.RESET_ALL} it was taken {labels[key]}")
+            return None
+    return snapshot
+
+def get_directory_tree(root_directory, output_file, exclude=None, json_output=False, max_depth=None,
+                       max_entries=None, terminal=True, ndjson_output=False, jobs=1, snapshot_path=None):
+    """
+    Walk the directory tree once, streaming each line to the output file and (colored) to the terminal as it is found.
+    Memory stays flat however large the tree is; only the folders on the current path are held.
+    - NDJSON records are streamed during the walk as well.
+    - Nested JSON needs the whole tree, so with --json the scanned nodes are kept in memory.
+    - With jobs > 1, folders are listed concurrently (for NFS/SMB shares); the output order does not change.
+    - With a snapshot file, folders whose modification time is unchanged since the last run are taken from it,
+      changes are written to a diff report, and the snapshot is then updated.
+    """
+    start_time = time.time()  # Start timing the script execution
+    current_date = datetime.now().strftime("%Y-%m-%d %H:%M:%S")  # Get current date/time
+    # Compile the exclude patterns once (gitignore-style, see fswalk.ExcludeRules)
+    rules = exclude if isinstance(exclude, ExcludeRules) else ExcludeRules(exclude or ())
+    root = None
+    if json_output:
+        root = TreeNode(os.path.basename(os.path.normpath(root_directory)), True, 0, os.stat(root_directory).st_mtime_ns)
+
+    ndjson_file = output_file.replace(".txt", ".ndjson")
+    ndjson = open(ndjson_file, "w", encoding="utf-8") if ndjson_output else None
+
+    snapshot = snapshot_writer = tree_diff = None
+    listing_counts = Counter()
+    if snapshot_path:
+        snapshot = load_snapshot(snapshot_path, root_directory, rules, max_depth, max_entries)
+        snapshot_writer = SnapshotWriter(snapshot_path, root_directory, rules, max_depth, max_entries)
+    if snapshot is not None:
+        diff_file = output_file.replace(".txt", ".diff.txt")
+        tree_diff = TreeDiff(snapshot, open(diff_file, "w", encoding="utf-8"))
+        tree_diff.stream.write(f"Changes since {snapshot.header['created']} in {os.path.abspath(root_directory)}\n\n")
+
+    def on_listing(*listing):
+        listing_counts["reused" if listing[-1] else "listed"] += 1
+        if snapshot_writer is not None:
+            snapshot_writer.add(*listing)
+        if tree_diff is not None:
+            tree_diff.compare(*listing)
+
+    # The progress bar would garble the live tree, so it is only shown with --no-terminal
+    with tqdm(desc="Scanning Directories", unit="folder", dynamic_ncols=True, disable=terminal) as progress_bar, \
+            tempfile.TemporaryFile("w+", encoding="utf-8") as body:
+        try:
+            for prefix, connector, item, relative_path in walk_tree(root_directory, rules, max_depth, max_entries,
+                                                                    progress_bar, root, jobs, snapshot, on_listing):
+                body.write(format_line(prefix, connector, item, use_colors=False) + "\n")
+                if terminal:
+                    sys.stdout.write(format_line(prefix, connector, item) + "\n")
+                if ndjson is not None and relative_path is not None:
+                    ndjson.write(json.dumps(node_record(item, relative_path), ensure_ascii=False) + "\n")
+        except BaseException:
+            if snapshot_writer is not None:
+                snapshot_writer.discard()  # Keep the previous snapshot if the scan did not finish
+            raise
+
+        end_time = time.time()  # Stop timing execution
+        execution_time = end_time - start_time  # Calculate elapsed time
+
+        # Write to file (without color formatting); the header needs the execution time, so the body follows it
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write("📂 Directory Structure Report\n")
+            f.write("Generated by: Directory Structure Generator\n")
+            f.write("Author: yung-megafone\n")
+            f.write(f"Generated on: {current_date}\n")
+            f.write(f"Execution Time: {execution_time:.2f} seconds\n")
+            f.write("-" * 50 + "\n\n")  # Separator
+            f.write(f"📂 {os.path.basename(root_directory)}/\n")
+            body.seek(0)
+            shutil.copyfileobj(body, f)
 
     print(f"\n{Fore.GREEN}✔ Directory structure saved to:{Style.RESET_ALL} {output_file}")
 
-    # Print to terminal with colors
-    print("\n".join(tree_structure_colored))
+    if snapshot_writer is not None:
+        snapshot_writer.commit()
+        print(f"{Fore.GREEN}✔ Snapshot saved to:{Style.RESET_ALL} {snapshot_path} "
+              f"({listing_counts['reused']} unchanged folders reused, {listing_counts['listed']} listed)")
+
+    if tree_diff is not None:
+        tree_diff.stream.write(f"\n{tree_diff.summary()}\n")
+        tree_diff.stream.close()
+        print(f"{Fore.GREEN}✔ Changes saved to:{Style.RESET_ALL} {diff_file} ({tree_diff.summary()})")
+
+    if ndjson is not None:
+        ndjson.close()
+        print(f"{Fore.GREEN}✔ NDJSON output saved to:{Style.RESET_ALL} {ndjson_file}")
 
     # JSON Output
     if json_output:
         json_file = output_file.replace(".txt", ".json")
-        tree_dict = {"name": os.path.basename(root_directory), "children": tree_structure_plain}
+        sum_folder_sizes(root)
         with open(json_file, "w", encoding="utf-8") as jf:
-            json.dump(tree_dict, jf, indent=4)
+            write_json_tree(root, jf)
         print(f"{Fore.GREEN}✔ JSON output saved to:{Style.RESET_ALL} {json_file}")
 
+def generate_benchmark_tree(directory, folder_count, files_per_folder):
+    """Creates `folder_count` folders (10 per parent, nested) with `files_per_folder` small files each."""
+    folders = [directory]
+    for index in range(folder_count):
+        folder = os.path.join(folders[index // 10], f"folder{index:04d}")
+        os.mkdir(folder)
+        folders.append(folder)
+        for file_index in range(files_per_folder):
+            with open(os.path.join(folder, f"file{file_index:03d}.bin"), "wb") as f:
+                f.write(b"\0" * file_index)
+
+@contextmanager
+def injected_latency(seconds):
+    """Adds `seconds` of sleep to every directory listing and every stat, like the round trip of a network share."""
+    global list_directory, node_from_entry
+    original_list_directory, original_node_from_entry = list_directory, node_from_entry
+
+    def slow_list_directory(*args, **kwargs):
+        time.sleep(seconds)
+        return original_list_directory(*args, **kwargs)
+
+    def slow_node_from_entry(*args, **kwargs):
+        time.sleep(seconds)
+        return original_node_from_entry(*args, **kwargs)
+
+    list_directory, node_from_entry = slow_list_directory, slow_node_from_entry
+    try:
+        yield
+    finally:
+        list_directory, node_from_entry = original_list_directory, original_node_from_entry
+
+def benchmark_listing(latency_ms, jobs, folder_count=200, files_per_folder=10):
+    """Compares serial and concurrent walks of a generated tree with injected per-syscall latency."""
+    with tempfile.TemporaryDirectory(prefix="dir-structure-benchmark-") as directory:
+        generate_benchmark_tree(directory, folder_count, files_per_folder)
+        print(f"Generated {folder_count} folders with {files_per_folder} files each; "
+              f"injecting {latency_ms:g} ms per listing and per stat.")
+
+        outputs = {}
+        with injected_latency(latency_ms / 1000):
+            for job_count in (1, jobs):
+                start_time = time.perf_counter()
+                outputs[job_count] = [format_line(prefix, connector, item, use_colors=False)
+                                      for prefix, connector, item, _ in walk_tree(directory, jobs=job_count)]
+                elapsed = time.perf_counter() - start_time
+                print(f"{job_count:>3} job(s): {elapsed:.2f} s ({(folder_count + 1) / elapsed:.1f} folders/s)")
+
+    print("✔ Output is identical." if outputs[1] == outputs[jobs] else "⚠ Output differs between serial and concurrent walks!")
+
 # Command-line argument parsing
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate an ASCII directory structure with file sizes and optional exclusions.")
-    parser.add_argument("directory", help="Directory to scan.")
-    parser.add_argument("--exclude", nargs="+", help="Folders or file types to exclude", default=[])
-    parser.add_argument("--json", action="store_true", help="Output directory structure as JSON")
+    parser.add_argument("directory", nargs="?", help="Directory to scan.")
+    parser.add_argument("--exclude", nargs="+", help="Folders or files to exclude, as gitignore-style patterns (e.g. node_modules/ '*.tmp' /build '!keep.log')", default=[])
+    parser.add_argument("--exclude-from", metavar="FILE", help="Read gitignore-style exclude rules from a file (applied after --exclude)")
+    parser.add_argument("--include", nargs="+", help="Only list files matching one of these patterns (e.g. '*.mp3' '*.flac')", default=[])
+    parser.add_argument("--json", action="store_true", help="Output directory structure as nested JSON (name, type, size, mtime, child counts)")
+    parser.add_argument("--ndjson", action="store_true", help="Stream one JSON record per entry to an .ndjson file during the scan")
+    parser.add_argument("--max-depth", type=int, help="Only list folders up to this depth (1 = the directory's own contents)")
+    parser.add_argument("--max-entries-per-dir", type=int, help="Show at most this many entries per folder and summarize the rest")
+    parser.add_argument("--no-terminal", action="store_true", help="Do not print the tree to the terminal (shows a progress bar instead)")
+    parser.add_argument("--jobs", type=int, default=1, help="Number of threads listing folders concurrently, for network shares (default: 1)")
+    parser.add_argument("--snapshot", metavar="FILE", help="Reuse unchanged folders from this snapshot, report changes since it and update it (files rewritten in place keep their old size until their folder changes)")
+    parser.add_argument("--benchmark-latency", type=float, metavar="MS", help="Compare serial and --jobs walks of a generated tree with MS of injected latency per syscall")
 
     args = parser.parse_args()
-    root_directory = args.directory.strip()
     output_file = "directory_structure.txt"
 
+    if args.benchmark_latency is not None:
+        benchmark_listing(args.benchmark_latency, max(2, args.jobs))
+        sys.exit()
+
+    root_directory = (args.directory or "").strip()
+    try:
+        if args.exclude_from:
+            rules = ExcludeRules.from_file(args.exclude_from, args.exclude, args.include)
+        else:
+            rules = ExcludeRules(args.exclude, args.include)
+    except (OSError, re.error) as e:
+        print(f"{Fore.RED}Error:{Style.RESET_ALL} Invalid exclude rules: {e}")
+        sys.exit(1)
+
     if os.path.isdir(root_directory):
-        get_directory_tree(root_directory, output_file, exclude=args.exclude, json_output=args.json)
+        get_directory_tree(root_directory, output_file, exclude=rules, json_output=args.json,
+                           max_depth=args.max_depth, max_entries=args.max_entries_per_dir, terminal=not args.no_terminal,
+                           ndjson_output=args.ndjson, jobs=max(1, args.jobs), snapshot_path=args.snapshot)
     else:
         print(f"{Fore.RED}Error:{Style.RESET_ALL} Invalid directory. Please enter a valid path.")
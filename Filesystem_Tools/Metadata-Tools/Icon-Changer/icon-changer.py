@@ -1,118 +1,475 @@
 """
-Folder Icon Changer (Windows Only)
+Folder Icon Changer
 -----------------------------------
 Author: yung-megafone
 Date: 2025-02-19
 License: MIT License
 
 Description:
-This script applies a custom `.ico` file as the folder icon for all subdirectories inside a given parent directory.  
-It works **only on Windows** using `desktop.ini` and file attribute settings.
+This script applies a custom icon as the folder icon for all subdirectories inside a given parent directory.  
+Platform backends:
+- **windows**: `desktop.ini` and file attributes, set natively through the Win32 API (no `attrib` processes).
+- **kde**: a `.directory` file in each folder (Dolphin and other KDE file managers).
+- **gnome**: the `metadata::custom-icon` attribute, set through `gio` (Nautilus and other GVfs file managers).
 
 Features:
 - Supports **recursive mode** (`--recursive`) to apply icons to all nested subfolders.
 - Ensures Windows correctly applies the custom icon by updating **desktop.ini**.
-- Copies `.ico` into each folder for proper recognition
+- Copies the icon into each folder for proper recognition (hard-linked to the source where possible)
+- Skips folders whose icon, desktop.ini / .directory and attributes are already correct
+- Processes folders concurrently on a pool of `--jobs` threads
 - Prevents modifying folders outside the parent directory.
 - Fastest method without restarting `explorer.exe`
-- Uses `ie4uinit.exe -show` to refresh icons instantly
-- Generates a report summarizing modified folders
+- Uses `ie4uinit.exe -show` once per run to refresh icons instantly
+- Generates a report of changed, already up-to-date and failed folders
 
 Usage:
-    python icon-changer.py <parent_directory> <icon_path> [--recursive]
+    python icon-changer.py <parent_directory> <icon_path> [--recursive] [--backend auto|windows|kde|gnome] [--jobs N]
+                           [--no-hardlink] [--fake-attributes state.json]
 
 Example:
     python icon-changer.py "C:\\Users\\YourName\\Documents" "C:\\Users\\YourName\\icon.ico" --recursive
+    python icon-changer.py /srv/share/Projects ./icon.png --recursive --backend kde --jobs 8
 """
 import os
-import argparse
+import sys
+import json
+import stat
 import shutil
+import ctypes
+import hashlib
+import argparse
+import threading
+import subprocess
+import configparser
+from abc import ABC, abstractmethod
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
 from tqdm import tqdm
 from colorama import Fore, Style
 
-def apply_icon_windows(folder_path, icon_path):
-    """Applies a custom icon to a folder on Windows using desktop.ini."""
+try:
+    import gi  # PyGObject, optional: sets GNOME metadata in-process instead of running `gio`
+    gi.require_version("Gio", "2.0")
+    from gi.repository import Gio
+except (ImportError, ValueError):
+    Gio = None
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from fswalk import walk_directories  # Shared scandir-based walker (Filesystem_Tools/fswalk.py)
+
+ICON_FILENAME = "folder.ico"  # Name of the icon copy inside each folder
+DESKTOP_INI_CONTENT = f"[.ShellClassInfo]\nIconResource={ICON_FILENAME},0\n"
+HASH_CHUNK_SIZE = 1024 * 1024  # Bytes read at a time when hashing icons
+FOLDER_QUEUE_PER_JOB = 4  # Folders queued per worker thread before the main thread waits
+DIRECTORY_FILE = ".directory"  # KDE per-folder settings file
+GIO_ICON_ATTRIBUTE = "metadata::custom-icon"  # GVfs metadata key read by Nautilus and other GNOME file managers
+
+# Windows file attributes used for custom folder icons, by `attrib` letter
+ATTRIBUTE_FLAGS = {
+    "h": getattr(stat, "FILE_ATTRIBUTE_HIDDEN", 0x2),
+    "s": getattr(stat, "FILE_ATTRIBUTE_SYSTEM", 0x4),
+    "r": getattr(stat, "FILE_ATTRIBUTE_READONLY", 0x1),
+}
+FILE_ATTRIBUTE_NORMAL = 0x80  # Passed to SetFileAttributesW when no other attribute is left
+SETTABLE_ATTRIBUTES = 0x1 | 0x2 | 0x4 | 0x20 | 0x100 | 0x1000 | 0x2000  # Attributes SetFileAttributesW accepts
+
+def attribute_mask(letters):
+    """Returns the combined FILE_ATTRIBUTE_* flags for attribute letters, e.g. "hs"."""
+    mask = 0
+    for letter in letters:
+        mask |= ATTRIBUTE_FLAGS[letter]
+    return mask
+
+class WindowsAttributes:
+    """
+    Reads Windows file attributes from os.stat() and changes them with SetFileAttributesW, so no `attrib`
+    process is started and paths never pass through a shell. Only available on Windows.
+    """
+
+    def __init__(self):
+        self._set_attributes = ctypes.WinDLL("kernel32", use_last_error=True).SetFileAttributesW
+        self._set_attributes.argtypes = (ctypes.c_wchar_p, ctypes.c_uint32)
+        self._set_attributes.restype = ctypes.c_int
+
+    def get(self, path):
+        """Returns the set attribute letters ("h", "s", "r") of a file or folder."""
+        attributes = os.stat(path).st_file_attributes
+        return {letter for letter, flag in ATTRIBUTE_FLAGS.items() if attributes & flag}
+
+    def set(self, path, add="", remove=""):
+        """Adds and removes attribute letters, e.g. set(path, add="hs")."""
+        attributes = os.stat(path).st_file_attributes & SETTABLE_ATTRIBUTES
+        attributes = (attributes & ~attribute_mask(remove)) | attribute_mask(add)
+        if not self._set_attributes(os.path.abspath(path), attributes or FILE_ATTRIBUTE_NORMAL):
+            raise ctypes.WinError(ctypes.get_last_error())
+
+    def close(self):
+        pass
+
+class FakeAttributes:
+    """
+    Keeps file attributes in a JSON file instead of the filesystem, so the Windows icon logic (including the
+    up-to-date checks) can run and be tested on Linux. Attributes persist between runs in `state_path`.
+    """
+
+    def __init__(self, state_path):
+        self.state_path = state_path
+        self._attributes = {}
+        self._lock = threading.Lock()  # Shared by the worker threads
+        if os.path.isfile(state_path):
+            with open(state_path, encoding="utf-8") as state_file:
+                self._attributes = {path: set(letters) for path, letters in json.load(state_file).items()}
+
+    def get(self, path):
+        if not os.path.exists(path):
+            raise FileNotFoundError(path)
+        with self._lock:
+            return set(self._attributes.get(os.path.abspath(path), ()))
+
+    def set(self, path, add="", remove=""):
+        with self._lock:
+            letters = self._attributes.setdefault(os.path.abspath(path), set())
+            letters.difference_update(remove)
+            letters.update(add)
+
+    def close(self):
+        with open(self.state_path, "w", encoding="utf-8") as state_file:
+            json.dump({path: "".join(sorted(letters)) for path, letters in sorted(self._attributes.items())},
+                      state_file, indent=1)
+
+def file_digest(path):
+    """Returns the SHA-256 of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+class IconSource:
+    """The source .ico with its size and hash, computed once for all folders."""
+
+    def __init__(self, icon_path):
+        self.path = os.path.abspath(icon_path)
+        self.stat = os.stat(self.path)
+        self.digest = file_digest(self.path)
+
+    def matches(self, target_path):
+        """True if target_path already holds this icon (same file, or same size and hash)."""
+        try:
+            target_stat = os.stat(target_path)
+        except FileNotFoundError:
+            return False
+        if (target_stat.st_dev, target_stat.st_ino) == (self.stat.st_dev, self.stat.st_ino):
+            return True  # Hard link to the source
+        return target_stat.st_size == self.stat.st_size and file_digest(target_path) == self.digest
+
+def install_icon(icon, target_path, hardlink=True):
+    """Places the icon at target_path, as a hard link to the source where the filesystem allows it, else a copy."""
+    if os.path.lexists(target_path):
+        os.remove(target_path)
+    if hardlink:
+        try:
+            os.link(icon.path, target_path)
+            return
+        except OSError:
+            pass  # Different volume, or links not supported (e.g. FAT32, some network shares)
+    shutil.copy2(icon.path, target_path)
+
+def read_desktop_ini(desktop_ini_path):
+    """Returns the contents of desktop.ini, or None if it is missing or unreadable."""
+    try:
+        with open(desktop_ini_path) as ini_file:
+            return ini_file.read()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+def apply_icon_windows(folder_path, icon, attributes, hardlink=True):
+    """
+    Applies a custom icon to a folder on Windows using desktop.ini, skipping every step that is already done.
+    Returns (status, error) where status is "changed", "up-to-date" or "failed".
+    """
     desktop_ini_path = os.path.join(folder_path, "desktop.ini")
-    copied_icon_path = os.path.join(folder_path, "folder.ico")  # Copy .ico inside folder
+    copied_icon_path = os.path.join(folder_path, ICON_FILENAME)  # Icon inside the folder
 
     try:
-        # Copy the .ico file into the folder (overwrite if exists)
-        shutil.copy2(icon_path, copied_icon_path)
+        icon_current = icon.matches(copied_icon_path)
+        ini_current = read_desktop_ini(desktop_ini_path) == DESKTOP_INI_CONTENT
+        ini_attributes = attributes.get(desktop_ini_path) if os.path.exists(desktop_ini_path) else set()
+        folder_attributes = attributes.get(folder_path)
+
+        if icon_current and ini_current and {"h", "s"} <= ini_attributes and "r" in folder_attributes:
+            return "up-to-date", None
 
-        # Remove existing desktop.ini attributes (if present) to allow modifications
-        if os.path.exists(desktop_ini_path):
-            os.system(f'attrib -h -s -r "{desktop_ini_path}"')
+        if not icon_current:
+            install_icon(icon, copied_icon_path, hardlink)
 
-        # Write the desktop.ini file
-        with open(desktop_ini_path, "w") as ini_file:
-            ini_file.write(f"[.ShellClassInfo]\nIconResource=folder.ico,0\n")
+        if not ini_current:
+            # Remove existing desktop.ini attributes (if present) to allow modifications
+            if ini_attributes & {"h", "s", "r"}:
+                attributes.set(desktop_ini_path, remove="hsr")
+                ini_attributes = set()
+            with open(desktop_ini_path, "w") as ini_file:
+                ini_file.write(DESKTOP_INI_CONTENT)
 
         # Set required attributes for Windows to recognize the custom icon
-        os.system(f'attrib +h +s "{desktop_ini_path}"')  # Hide & system-protect desktop.ini
-        os.system(f'attrib +r "{folder_path}"')  # Ensure folder is read-only (required for custom icons)
+        if not {"h", "s"} <= ini_attributes:
+            attributes.set(desktop_ini_path, add="hs")  # Hide & system-protect desktop.ini
+        if "r" not in folder_attributes:
+            attributes.set(folder_path, add="r")  # Folder must be read-only for custom icons
 
-        return True  # Success
+        return "changed", None
 
     except Exception as e:
-        print(f"{Fore.RED}Failed to apply icon:{Style.RESET_ALL} {folder_path} - {e}")
-        return False  # Failure
+        return "failed", str(e)
 
 def refresh_icons():
     """Refreshes Windows icons using the fastest method (without restarting Explorer)."""
     print(f"{Fore.CYAN}🔄 Refreshing folder icons...{Style.RESET_ALL}")
-    os.system("ie4uinit.exe -show")  # Windows shell refresh
+    subprocess.run(["ie4uinit.exe", "-show"], check=False)  # Windows shell refresh
+
+class IconBackend(ABC):
+    """
+    Interface for platform backends (a backend without apply() cannot be created).
+
+    - apply() sets the icon of one folder and returns (status, error), like apply_icon_windows().
+      It is called from several worker threads at once, each with a different folder.
+    - refresh() runs once after all folders, if any folder changed.
+    - close() runs at the end, even if the run failed.
+    """
+
+    name = None
+    icon_extensions = ()  # Accepted icon file extensions
+
+    @abstractmethod
+    def apply(self, folder_path, icon, hardlink=True):
+        pass
+
+    def refresh(self):
+        pass
+
+    def close(self):
+        pass
+
+class WindowsBackend(IconBackend):
+    """desktop.ini, folder.ico and file attributes (native, or simulated with FakeAttributes)."""
+
+    name = "windows"
+    icon_extensions = (".ico",)
 
-def apply_folder_icons(parent_directory, icon_path, recursive):
-    """Applies a custom icon to all folders inside the given directory."""
+    def __init__(self, attributes):
+        self.attributes = attributes
+
+    def apply(self, folder_path, icon, hardlink=True):
+        return apply_icon_windows(folder_path, icon, self.attributes, hardlink)
+
+    def refresh(self):
+        if isinstance(self.attributes, WindowsAttributes):
+            refresh_icons()  # Nothing to refresh when the attributes are simulated
+
+    def close(self):
+        self.attributes.close()
+
+class FreedesktopBackend(IconBackend):
+    """
+    Shared logic of the Linux backends: the icon is placed in each folder as a hidden `.folder.<ext>`
+    (hard-linked where possible), so it moves with the folder, and the file manager setting points to it.
+    Subclasses implement has_icon() and set_icon().
+    """
+
+    icon_extensions = (".png", ".svg", ".svgz", ".xpm", ".ico")
+
+    @abstractmethod
+    def has_icon(self, folder_path, copied_icon_path):
+        pass
+
+    @abstractmethod
+    def set_icon(self, folder_path, copied_icon_path):
+        pass
+
+    def apply(self, folder_path, icon, hardlink=True):
+        copied_icon_path = os.path.join(folder_path, ".folder" + os.path.splitext(icon.path)[1].lower())
+
+        try:
+            icon_current = icon.matches(copied_icon_path)
+            setting_current = self.has_icon(folder_path, copied_icon_path)
+            if icon_current and setting_current:
+                return "up-to-date", None
+
+            if not icon_current:
+                install_icon(icon, copied_icon_path, hardlink)
+            if not setting_current:
+                self.set_icon(folder_path, copied_icon_path)
+
+            return "changed", None
+
+        except Exception as e:
+            return "failed", str(e)
+
+class KdeBackend(FreedesktopBackend):
+    """Writes `Icon=./.folder.<ext>` to the [Desktop Entry] group of each folder's .directory file."""
+
+    name = "kde"
+
+    @staticmethod
+    def _read(directory_file_path):
+        parser = configparser.ConfigParser(interpolation=None, strict=False)
+        parser.optionxform = str  # Keep key case (Dolphin writes e.g. "ViewMode")
+        parser.read(directory_file_path, encoding="utf-8")  # Missing files give an empty parser
+        return parser
+
+    def has_icon(self, folder_path, copied_icon_path):
+        parser = self._read(os.path.join(folder_path, DIRECTORY_FILE))
+        return parser.get("Desktop Entry", "Icon", fallback=None) == "./" + os.path.basename(copied_icon_path)
+
+    def set_icon(self, folder_path, copied_icon_path):
+        directory_file_path = os.path.join(folder_path, DIRECTORY_FILE)
+        parser = self._read(directory_file_path)  # Keeps the other settings Dolphin stored in the file
+        if not parser.has_section("Desktop Entry"):
+            parser.add_section("Desktop Entry")
+        parser.set("Desktop Entry", "Icon", "./" + os.path.basename(copied_icon_path))
+        with open(directory_file_path, "w", encoding="utf-8") as directory_file:
+            parser.write(directory_file, space_around_delimiters=False)
+
+class GnomeBackend(FreedesktopBackend):
+    """
+    Sets the GVfs `metadata::custom-icon` attribute of each folder to the icon's file URI, in-process through
+    PyGObject when it is installed and with the `gio` command otherwise. GVfs keeps this metadata per user,
+    so the icons show up for the user who ran the script.
+    """
+
+    name = "gnome"
+
+    @staticmethod
+    def _run_gio(*arguments):
+        """Runs `gio` with an argument list (no shell) and returns its output; raises OSError on failure."""
+        try:
+            result = subprocess.run(["gio", *arguments], capture_output=True, text=True)
+        except FileNotFoundError:
+            raise OSError("the `gio` command was not found (install GLib's gio or PyGObject)") from None
+        if result.returncode != 0:
+            raise OSError(result.stderr.strip() or f"gio exited with status {result.returncode}")
+        return result.stdout
+
+    def has_icon(self, folder_path, copied_icon_path):
+        uri = Path(os.path.abspath(copied_icon_path)).as_uri()
+        if Gio is not None:
+            info = Gio.File.new_for_path(folder_path).query_info(GIO_ICON_ATTRIBUTE, Gio.FileQueryInfoFlags.NONE, None)
+            return info.get_attribute_string(GIO_ICON_ATTRIBUTE) == uri
+
+        for line in self._run_gio("info", "--attributes", GIO_ICON_ATTRIBUTE, "--", os.path.abspath(folder_path)).splitlines():
+            key, _, value = line.strip().partition(": ")
+            if key == GIO_ICON_ATTRIBUTE:
+                return value == uri
+        return False
+
+    def set_icon(self, folder_path, copied_icon_path):
+        uri = Path(os.path.abspath(copied_icon_path)).as_uri()
+        if Gio is not None:
+            Gio.File.new_for_path(folder_path).set_attribute_string(GIO_ICON_ATTRIBUTE, uri, Gio.FileQueryInfoFlags.NONE, None)
+        else:
+            self._run_gio("set", "--", os.path.abspath(folder_path), GIO_ICON_ATTRIBUTE, uri)
+
+def default_backend_name():
+    """Picks the backend for this system: windows on Windows, gnome on GNOME desktops, kde otherwise."""
+    if os.name == "nt":
+        return "windows"
+    if "GNOME" in os.environ.get("XDG_CURRENT_DESKTOP", "").upper():
+        return "gnome"
+    return "kde"
+
+def create_backend(name, fake_attributes=None):
+    """Creates a backend by name ("auto", "windows", "kde" or "gnome"); raises ValueError if it cannot run here."""
+    if name == "auto":
+        name = "windows" if fake_attributes else default_backend_name()
+
+    if name == "windows":
+        if fake_attributes:
+            return WindowsBackend(FakeAttributes(fake_attributes))
+        if os.name != "nt":
+            raise ValueError("The windows backend requires Windows (use --fake-attributes to simulate).")
+        return WindowsBackend(WindowsAttributes())
+
+    if fake_attributes:
+        raise ValueError("--fake-attributes only applies to the windows backend.")
+    return KdeBackend() if name == "kde" else GnomeBackend()
+
+def apply_folder_icons(parent_directory, icon_path, recursive, backend, hardlink=True, jobs=4):
+    """
+    Applies a custom icon to all folders inside the given directory, skipping folders that already have it.
+    Folders are processed by `jobs` worker threads behind a bounded queue; results are recorded in folder order.
+    """
     
-    # Ensure the icon file is a valid `.ico` file
-    if not icon_path.lower().endswith(".ico"):
-        print(f"{Fore.RED}Error:{Style.RESET_ALL} Invalid icon format. Please use a `.ico` file for Windows.")
+    # Ensure the icon file has a format the backend can use
+    if not icon_path.lower().endswith(backend.icon_extensions):
+        print(f"{Fore.RED}Error:{Style.RESET_ALL} Invalid icon format for the {backend.name} backend. "
+              f"Please use a {' / '.join(backend.icon_extensions)} file.")
         return
 
-    modified_folders = []  # Store successfully modified folders
+    icon = IconSource(icon_path)  # Size and hash of the source icon, read once
+    results = {"changed": [], "up-to-date": [], "failed": []}
 
-    # Get all folders (recursive or not)
-    folder_list = []
-    for root, dirs, _ in os.walk(parent_directory):
-        for folder in dirs:
-            folder_list.append(os.path.join(root, folder))
+    # Get all folders (recursive or not; if not recursive, only top-level folders)
+    folder_list = [entry.path for entry in walk_directories(parent_directory, recursive=recursive)]
 
-        # If not recursive, only modify top-level folders
-        if not recursive:
-            break
+    def record(folder_path, future):
+        status, error = future.result()
+        results[status].append((folder_path, error))
+        if error:
+            tqdm.write(f"{Fore.RED}Failed to apply icon:{Style.RESET_ALL} {folder_path} - {error}")
+        progress.update(1)
 
-    # Apply icons with progress bar
-    for folder_path in tqdm(folder_list, desc="Applying Icons", unit="folder"):
-        if apply_icon_windows(folder_path, icon_path):
-            modified_folders.append(folder_path)
+    # Apply icons on the worker pool with progress bar
+    with ThreadPoolExecutor(max_workers=jobs) as executor, \
+            tqdm(total=len(folder_list), desc="Applying Icons", unit="folder") as progress:
+        pending = deque()
+        for folder_path in folder_list:
+            pending.append((folder_path, executor.submit(backend.apply, folder_path, icon, hardlink)))
+            if len(pending) >= jobs * FOLDER_QUEUE_PER_JOB:
+                record(*pending.popleft())
+        while pending:
+            record(*pending.popleft())
 
-    # Force Windows shell refresh without restarting Explorer
-    refresh_icons()
+    # Let the platform pick up the new icons (only needed if something changed)
+    if results["changed"]:
+        backend.refresh()
 
     # Generate report
-    generate_report(modified_folders)
+    generate_report(results)
 
-def generate_report(modified_folders):
-    """Generates a report of all folders that were modified."""
+def generate_report(results):
+    """Generates a report of changed, already up-to-date and failed folders."""
     report_file = "icon_change_report.txt"
 
     with open(report_file, "w", encoding="utf-8") as f:
         f.write("📂 Folder Icon Change Report\n")
         f.write("Generated by: Folder Icon Changer\n")
-        f.write(f"Modified Folders: {len(modified_folders)}\n")
+        f.write(f"Changed Folders: {len(results['changed'])}\n")
+        f.write(f"Already Up to Date: {len(results['up-to-date'])}\n")
+        f.write(f"Failed Folders: {len(results['failed'])}\n")
         f.write("-" * 50 + "\n")
 
-        for folder in modified_folders:
+        for folder, _ in results["changed"]:
             f.write(f"✔ {folder}\n")
+        for folder, _ in results["up-to-date"]:
+            f.write(f"= {folder}\n")
+        for folder, error in results["failed"]:
+            f.write(f"✖ {folder} - {error}\n")
 
-    print(f"{Fore.GREEN}✔ Icon change report saved to:{Style.RESET_ALL} {report_file}")
+    print(f"{Fore.GREEN}✔ Icon change report saved to:{Style.RESET_ALL} {report_file} "
+          f"({len(results['changed'])} changed, {len(results['up-to-date'])} up to date, {len(results['failed'])} failed)")
 
 def main():
-    parser = argparse.ArgumentParser(description="Apply custom icons to folders in Windows.")
+    parser = argparse.ArgumentParser(description="Apply custom icons to folders (Windows, KDE or GNOME).")
     parser.add_argument("parent_directory", help="Directory containing folders to modify.")
-    parser.add_argument("icon_path", help="Path to the custom .ico file.")
+    parser.add_argument("icon_path", help="Path to the custom icon (.ico for Windows; .png, .svg, .xpm or .ico on Linux).")
     parser.add_argument("--recursive", action="store_true", help="Apply to all subfolders recursively.")
+    parser.add_argument("--backend", choices=("auto", "windows", "kde", "gnome"), default="auto",
+                        help="Platform backend (default: auto, i.e. windows on Windows, gnome on GNOME desktops, kde otherwise).")
+    parser.add_argument("--jobs", type=int, default=4, help="Number of threads processing folders (default: 4).")
+    parser.add_argument("--no-hardlink", action="store_true", help="Always copy the icon instead of hard-linking it to the source.")
+    parser.add_argument("--fake-attributes", metavar="STATE_FILE", help="Keep file attributes in a JSON file instead of setting them (windows backend, for testing on any OS).")
 
     args = parser.parse_args()
 
@@ -126,7 +483,17 @@ def main():
         print(f"{Fore.RED}Error:{Style.RESET_ALL} Icon file not found.")
         return
 
-    apply_folder_icons(args.parent_directory, args.icon_path, args.recursive)
+    try:
+        backend = create_backend(args.backend, args.fake_attributes)
+    except ValueError as e:
+        print(f"{Fore.RED}Error:{Style.RESET_ALL} {e}")
+        return
+
+    try:
+        apply_folder_icons(args.parent_directory, args.icon_path, args.recursive, backend, not args.no_hardlink,
+                           max(1, args.jobs))
+    finally:
+        backend.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
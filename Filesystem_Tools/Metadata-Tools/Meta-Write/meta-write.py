@@ -1,11 +1,25 @@
+import io
 import os
 import re
+import sys
+import json
+import time
+import random
+import csv
+import zlib
 import argparse
+import functools
 from mutagen.easyid3 import EasyID3
 from mutagen.flac import FLAC
 from mutagen.wave import WAVE
+from collections import Counter, deque
+from concurrent.futures import ThreadPoolExecutor
 from tqdm import tqdm
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from fswalk import walk_files  # Shared scandir-based walker (Filesystem_Tools/fswalk.py)
+from libindex import LibraryIndex  # Shared tag index (Filesystem_Tools/libindex.py)
+
 # Define flexible regex patterns
 FILENAME_PATTERNS = [
     re.compile(r"(\d{1,2})\s*[-_]\s*(.*?)\s*[-_]\s*(.*?)\s*\(?feat\.?\s*(.*?)\)?(\.\w+)$", re.IGNORECASE),
@@ -17,8 +31,29 @@ FILENAME_PATTERNS = [
 # Alternative feature artist identifiers
 FEATURED_PATTERNS = [r"feat\.?", r"ft\.?", r"featuring"]
 
-def parse_filename(filename):
-    """ Extract metadata from filename using flexible patterns. """
+# Precompiled forms of the patterns above for parse_filename()
+AUDIO_EXTENSION_PATTERN = re.compile(r"\.(mp3|flac|wav)$", re.IGNORECASE)
+SEPARATOR_PATTERN = re.compile(r"[-_]")
+FEATURED_MARKERS = [(re.compile(pattern, re.IGNORECASE), pattern) for pattern in FEATURED_PATTERNS]
+
+# All layouts in one alternation. Every layout is anchored at both ends, so the alternatives are tried in
+# FILENAME_PATTERNS order and the first layout that matches wins, exactly as with separate match() calls.
+LAYOUT_PATTERN = re.compile("|".join(f"({pattern.pattern})" for pattern in FILENAME_PATTERNS), re.IGNORECASE)
+LAYOUT_SUFFIX_PATTERN = re.compile(r"\.\w+$")  # Every layout ends with (\.\w+)$, so names without it skip LAYOUT_PATTERN
+LAYOUT_GROUPS = {}  # Group number of each layout's wrapper -> number of groups inside it
+_group_number = 1
+for _pattern in FILENAME_PATTERNS:
+    LAYOUT_GROUPS[_group_number] = _pattern.groups
+    _group_number += _pattern.groups + 1
+
+PARSE_CACHE_SIZE = 65536  # Distinct filenames remembered by parse_filename()
+REWRITE_PADDING = 64 * 1024  # Padding added when tags no longer fit, so later edits can be saved in place
+WRITE_QUEUE_PER_JOB = 4  # Parsed files queued per writer thread before the walker waits
+MANIFEST_TAGS = ("tracknumber", "artist", "title")  # Tag columns of export/apply manifests
+DEFAULT_BATCH_SIZE = 1000  # Manifest rows applied between checkpoints
+
+def parse_filename_legacy(filename):
+    """ Extract metadata from filename using flexible patterns (original parser, kept as the reference for --benchmark). """
     # First, remove the file extension to avoid it being treated as part of the title
     filename_no_ext = re.sub(r"\.(mp3|flac|wav)$", "", filename, flags=re.IGNORECASE)
     
@@ -69,9 +104,172 @@ def parse_filename(filename):
 
     return None  # Unable to extract valid metadata
 
-def write_metadata(file_path, metadata):
-    """ Writes metadata to a file using Mutagen. """
+@functools.lru_cache(maxsize=PARSE_CACHE_SIZE)
+def _parse_filename_cached(filename):
+    """ Single-pass version of parse_filename_legacy(); returns a tuple of metadata items or None. """
+    filename_no_ext = AUDIO_EXTENSION_PATTERN.sub("", filename)
+    extension = filename.split('.')[-1]
+
+    # One match call covers every layout in FILENAME_PATTERNS (skipped when no layout can match)
+    match = LAYOUT_PATTERN.match(filename_no_ext) if LAYOUT_SUFFIX_PATTERN.search(filename_no_ext) else None
+    if match:
+        start = match.lastindex  # The wrapper group of the layout that matched
+        groups = match.groups()[start:start + LAYOUT_GROUPS[start]]
+        return (
+            ("track_number", groups[0] if groups[0].isdigit() else "00"),
+            ("artist", groups[1].strip()),
+            ("title", groups[2].strip()),
+            ("featured_artists", groups[3].strip() if len(groups) > 3 and groups[3] else ""),
+            ("extension", extension),
+        )
+
+    # Fallback: first part is the artist, last part is the title
+    parts = [part for part in (part.strip() for part in SEPARATOR_PATTERN.split(filename_no_ext)) if part]
+    if len(parts) < 2:
+        return None  # Unable to extract valid metadata
+
+    title = parts[-1]
+    if title.lower().endswith(('mp3', 'flac', 'wav')):
+        title = title.rsplit('.', 1)[0]
+
+    featured_artists = ""
+    all_parts = " ".join(parts)
+    for marker, marker_text in FEATURED_MARKERS:
+        if marker.search(all_parts):
+            # Split on the marker text, as the original parser does
+            title_parts = " ".join(parts[1:]).split(marker_text, 1)
+            title, featured_artists = title_parts[0].strip(), title_parts[-1].strip()
+            break
+
+    return (
+        ("track_number", "00"),
+        ("artist", parts[0]),
+        ("title", title),
+        ("featured_artists", featured_artists),
+        ("extension", extension),
+    )
+
+def parse_filename(filename):
+    """ Extract metadata from filename in one pass with precompiled patterns; repeated filenames come from a cache. """
+    metadata = _parse_filename_cached(filename)
+    return dict(metadata) if metadata is not None else None
+
+def generate_filename_corpus(count, seed=0):
+    """ Returns `count` synthetic filenames covering every layout, separator and featured-artist marker (with repeats). """
+    rng = random.Random(seed)
+    words = ["Drake", "Kanye West", "Lil Baby", "God's Plan", "Flashing Lights", "HIGHEST IN THE ROOM", "Mr. Jones",
+             "Left Hand Free", "Daft Punk", "Soft Cell", "Ft Worth", "Vol.2", "Live", "Remix", "Don't Stop", "Sweet_Child"]
+    markers = ["feat.", "feat", "ft.", "ft", "featuring", "Feat.", "FT.", "(feat.", "(ft."]
+    separators = [" - ", "-", "_", " _ ", " -", "- "]
+    extensions = [".mp3", ".flac", ".wav", ".MP3", ".Flac"]
+
+    corpus = []
+    for _ in range(count):
+        if corpus and rng.random() < 0.3:  # Repeated filenames (e.g. "01 - Intro.mp3" across albums)
+            corpus.append(rng.choice(corpus))
+            continue
+
+        separator = rng.choice(separators)
+        fields = [rng.choice(words) for _ in range(rng.randint(1, 4))]
+        if rng.random() < 0.6:
+            fields.insert(0, f"{rng.randint(0, 120):0{rng.choice((1, 2, 3))}d}")
+        name = separator.join(fields)
+        if rng.random() < 0.4:
+            name += f" {rng.choice(markers)} {rng.choice(words)}" + (")" if rng.random() < 0.5 else "")
+        if rng.random() < 0.1:
+            name += rng.choice([".v2", ".final", ". ", "."])
+        corpus.append(name + rng.choice(extensions))
+
+    return corpus
+
+def benchmark_parser(count):
+    """ Times parse_filename_legacy() against parse_filename() on a synthetic corpus and checks the results match. """
+    corpus = generate_filename_corpus(count)
+    results = {}
+
+    for label, parser in (("legacy", parse_filename_legacy), ("single-pass", parse_filename)):
+        _parse_filename_cached.cache_clear()
+        start_time = time.perf_counter()
+        parsed = [parser(filename) for filename in corpus]
+        results[label] = (time.perf_counter() - start_time, parsed)
+
+    print(f"Parsed {len(corpus)} synthetic filenames ({len(set(corpus))} distinct)")
+    for label, (elapsed, _) in results.items():
+        print(f"  {label:<12} {elapsed:8.3f} s  {len(corpus) / elapsed if elapsed > 0 else 0.0:12.1f} names/s")
+
+    legacy, single_pass = results["legacy"][1], results["single-pass"][1]
+    mismatches = [filename for filename, old, new in zip(corpus, legacy, single_pass) if old != new]
+    if mismatches:
+        print(f"⚠ {len(mismatches)} results differ from the legacy parser, e.g. {mismatches[0]!r}")
+    else:
+        print("✔ Results are identical to the legacy parser.")
+
+def iter_parse_targets(paths):
+    """ Yields (path, filename) for audio files in the given directories, plain file paths, or paths read from stdin ("-"). """
+    supported_extensions = (".mp3", ".flac", ".wav")
+    for path in paths:
+        if path == "-":
+            for line in sys.stdin:
+                line = line.rstrip("\r\n")
+                if line:
+                    yield line, os.path.basename(line)
+        elif os.path.isdir(path):
+            for entry in walk_files(path, extensions=supported_extensions):
+                yield entry.path, entry.name
+        else:
+            yield path, os.path.basename(path)
+
+def parse_only(paths, output=None):
+    """ Streams path -> parsed metadata as JSONL without opening any audio file. """
+    stream = open(output, "w", encoding="utf-8") if output else sys.stdout
     try:
+        for path, filename in iter_parse_targets(paths):
+            stream.write(json.dumps({"path": path, "metadata": parse_filename(filename)}, ensure_ascii=False) + "\n")
+    finally:
+        if output:
+            stream.close()
+
+def metadata_to_tags(metadata):
+    """ Returns the tag values write_metadata() stores for parsed filename metadata. """
+    title = metadata["title"]
+    if metadata["featured_artists"]:
+        title += f" (feat. {metadata['featured_artists']})"
+
+    return {"tracknumber": metadata["track_number"], "artist": metadata["artist"], "title": title}
+
+class WriteCountingFile(io.FileIO):
+    """ Binary file that counts the bytes written through it (used to measure what audio.save() rewrites). """
+    bytes_written = 0
+
+    def write(self, data):
+        written = super().write(data)
+        self.bytes_written += written or 0
+        return written
+
+class PaddingPolicy:
+    """ Mutagen padding callback: reuse the existing padding when the tags fit, otherwise rewrite once with REWRITE_PADDING. """
+    def __init__(self):
+        self.in_place = True
+
+    def __call__(self, info):
+        if info.padding >= 0:
+            return info.padding  # Same tag size, so mutagen overwrites the tag block without moving the audio data
+        self.in_place = False
+        return REWRITE_PADDING
+
+def write_metadata(file_path, metadata, library_index=None):
+    """
+    Writes metadata to a file using Mutagen, skipping files whose tags already match.
+    Returns (status, bytes written, error) where status is "skipped", "in-place", "rewritten" or "failed".
+    """
+    return write_tags(file_path, metadata_to_tags(metadata), library_index)
+
+def write_tags(file_path, tags, library_index=None):
+    """ Writes a dict of tag values (e.g. from metadata_to_tags() or a manifest); see write_metadata(). """
+    try:
+        if library_index is not None and library_index.lookup_written(file_path, os.stat(file_path)) == tags:
+            return "skipped", 0, None
+
         file_ext = os.path.splitext(file_path)[1].lower()
 
         if file_ext == ".mp3":
@@ -82,44 +280,346 @@ def write_metadata(file_path, metadata):
             audio = WAVE(file_path)
         else:
             print(f"Skipping unsupported file: {file_path}")
-            return
+            return "failed", 0, "Unsupported file type"
 
-        # Set metadata
-        audio["tracknumber"] = metadata["track_number"]
-        audio["artist"] = metadata["artist"]
-        audio["title"] = metadata["title"]
-        
-        if metadata["featured_artists"]:
-            audio["title"] += f" (feat. {metadata['featured_artists']})"
+        # Leave the file untouched if it already has exactly these values
+        if all(audio.get(key) == [value] for key, value in tags.items()):
+            if library_index is not None:
+                library_index.store_written(file_path, os.stat(file_path), tags)
+            return "skipped", 0, None
 
-        # Save changes
-        audio.save()
+        # Set metadata (the featured artist is part of the title)
+        for key, value in tags.items():
+            audio[key] = value
+
+        # Save changes, in place when the existing padding allows it
+        padding_policy = PaddingPolicy()
+        with WriteCountingFile(file_path, "r+") as file:
+            audio.save(file, padding=padding_policy)
         tqdm.write(f"✔ Metadata applied to: {os.path.basename(file_path)}")
 
+        if library_index is not None:
+            library_index.store_written(file_path, os.stat(file_path), tags)
+        return ("in-place" if padding_policy.in_place else "rewritten"), file.bytes_written, None
+
     except Exception as e:
         tqdm.write(f"⚠ Error writing metadata to {os.path.basename(file_path)}: {e}")
+        return "failed", 0, str(e)
+
+def iter_report_paths(report_path, status="failed"):
+    """ Yields (path, filename) for every record with the given status in a JSONL report written by --report. """
+    with open(report_path, encoding="utf-8") as report:
+        for line in report:
+            record = json.loads(line)
+            if record["status"] == status:
+                yield record["path"], os.path.basename(record["path"])
+
+class TagWritePipeline:
+    """
+    Runs write_tags() on `jobs` worker threads behind a bounded queue and records every result in submission order
+    (progress bar, summary counts and an optional JSONL report of applied, skipped, unparseable and failed files).
+    """
+    def __init__(self, library_index=None, jobs=1, report_path=None, append_report=False):
+        self.library_index = library_index
+        self.jobs = max(1, jobs)
+        self.results = Counter()
+        self.bytes_written = 0
+        self._pending = deque()
+        self._executor = ThreadPoolExecutor(max_workers=self.jobs)
+        self._progress = tqdm(desc="Writing Metadata", unit="file")
+        self._report = open(report_path, "a" if append_report else "w", encoding="utf-8") if report_path else None
+
+    def submit(self, path, tags):
+        """ Queues a tag write (tags=None records the file as unparseable); waits for the oldest write if the queue is full. """
+        if not tags:
+            tqdm.write(f"⚠ Skipping {os.path.basename(path)} (Invalid format)")
+            self._record(path, "unparseable")
+            return
+
+        self._pending.append((path, tags, self._executor.submit(write_tags, path, tags, self.library_index)))
+        if len(self._pending) >= self.jobs * WRITE_QUEUE_PER_JOB:
+            self._finish_oldest()
+
+    def drain(self):
+        """ Waits until every queued write has finished and been recorded. """
+        while self._pending:
+            self._finish_oldest()
+        if self._report is not None:
+            self._report.flush()
+
+    def close(self):
+        try:
+            self.drain()
+        finally:
+            self._executor.shutdown()
+            self._progress.close()
+            if self._report is not None:
+                self._report.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _finish_oldest(self):
+        path, tags, future = self._pending.popleft()
+        write_status, written, error = future.result()
+        status = {"in-place": "applied", "rewritten": "applied"}.get(write_status, write_status)
+        self._record(path, status, write_status, written, error, tags)
 
-def process_files_in_directory(directory):
+    def _record(self, path, status, write_status=None, written=0, error=None, tags=None):
+        self.results[write_status or status] += 1
+        self.bytes_written += written
+        self._progress.update()
+        if self._report is not None:
+            self._report.write(json.dumps({"path": path, "status": status,
+                                           "write": write_status if status == "applied" else None,
+                                           "bytes_written": written, "tags": tags, "error": error},
+                                          ensure_ascii=False) + "\n")
+
+def process_files(candidates, library_index=None, jobs=1, report_path=None):
+    """
+    Pipeline: candidates are streamed in and parsed inline, and tag writes run on `jobs` worker threads
+    behind a bounded queue. Every file ends up in the JSONL report as applied, skipped, unparseable or failed.
+
+    :param candidates: Iterable of (path, filename) pairs, e.g. from iter_parse_targets().
+    :return: Counter of write statuses and the total number of bytes written.
+    """
+    with TagWritePipeline(library_index, jobs, report_path) as pipeline:
+        for path, filename in candidates:
+            metadata = parse_filename(filename)
+            pipeline.submit(path, metadata_to_tags(metadata) if metadata else None)
+
+    return pipeline.results, pipeline.bytes_written
+
+def process_files_in_directory(directory, library_index=None, jobs=1, report_path=None):
     """ Processes all audio files in a directory and subdirectories, updating their metadata. """
-    supported_extensions = (".mp3", ".flac", ".wav")
-    
-    # Recursively walk through all directories and files
-    for root, dirs, files in os.walk(directory):
-        for file in files:
-            if file.lower().endswith(supported_extensions):
-                file_path = os.path.join(root, file)
-                metadata = parse_filename(file)
-                if metadata:
-                    write_metadata(file_path, metadata)
-                else:
-                    tqdm.write(f"⚠ Skipping {file} (Invalid format)")
+    results, bytes_written = process_files(iter_parse_targets([directory]), library_index, jobs, report_path)
+    print_write_summary(results, bytes_written, library_index)
+
+def print_write_summary(results, bytes_written, library_index=None):
+    """ Prints how many files were skipped, updated in place or fully rewritten, and the bytes written. """
+    print(f"Skipped (already up to date): {results['skipped']}"
+          + (f" ({library_index.reused} from the library index)" if library_index is not None else ""))
+    print(f"Updated in place: {results['in-place']}")
+    print(f"Full rewrites: {results['rewritten']}")
+    print(f"Unparseable filenames: {results['unparseable']}")
+    print(f"Failed: {results['failed']}")
+    print(f"Bytes written: {bytes_written:,} ({bytes_written / (1024 * 1024):.2f} MB)")
+
+def manifest_format(path, requested=None):
+    """ Returns "csv" or "jsonl" for a manifest, from --format or else the file extension (default: jsonl). """
+    if requested:
+        return requested
+    return "csv" if path and path.lower().endswith(".csv") else "jsonl"
+
+def export_manifest(paths, output=None, manifest_type=None):
+    """ Streams a CSV or JSONL manifest of path and proposed tags (empty for unparseable names) for review or editing. """
+    manifest_type = manifest_format(output, manifest_type)
+    stream = open(output, "w", encoding="utf-8", newline="") if output else sys.stdout
+    exported = unparseable = 0
+
+    try:
+        writer = csv.writer(stream) if manifest_type == "csv" else None
+        if writer is not None:
+            writer.writerow(("path",) + MANIFEST_TAGS)
+
+        for path, filename in iter_parse_targets(paths):
+            metadata = parse_filename(filename)
+            tags = metadata_to_tags(metadata) if metadata else {}
+            unparseable += not metadata
+            exported += 1
+
+            if writer is not None:
+                writer.writerow([path] + [tags.get(tag, "") for tag in MANIFEST_TAGS])
+            else:
+                stream.write(json.dumps({"path": path, "tags": tags}, ensure_ascii=False) + "\n")
+    finally:
+        if output:
+            stream.close()
+
+    print(f"Exported {exported} files ({unparseable} with unparseable names).", file=sys.stderr)
+
+def iter_manifest(manifest_path, manifest_type=None):
+    """ Streams (row number, path, tags) from a CSV or JSONL manifest; empty tag values are left out. """
+    manifest_type = manifest_format(manifest_path, manifest_type)
+    with open(manifest_path, encoding="utf-8", newline="") as manifest:
+        if manifest_type == "csv":
+            rows = ((row["path"], {tag: row.get(tag) for tag in MANIFEST_TAGS}) for row in csv.DictReader(manifest))
+        else:
+            rows = ((row["path"], row.get("tags") or {}) for row in map(json.loads, filter(str.strip, manifest)))
+
+        for row_number, (path, tags) in enumerate(rows):
+            yield row_number, path, {tag: value for tag, value in tags.items() if tag in MANIFEST_TAGS and value}
+
+def parse_shard(shard):
+    """ Parses "--shard i/N" into (i, N) with 0 <= i < N. """
+    try:
+        index, count = (int(part) for part in shard.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError("expected i/N, e.g. 0/4")
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError("expected 0 <= i < N")
+    return index, count
+
+def in_shard(path, shard):
+    """ True if the path belongs to this shard; stable across machines and manifest re-exports. """
+    index, count = shard
+    return zlib.crc32(path.encode("utf-8", "surrogateescape")) % count == index
+
+def load_checkpoint(checkpoint_path, manifest_path, shard):
+    """ Returns the number of manifest rows already applied, or 0; refuses checkpoints from another manifest or shard. """
+    if not os.path.isfile(checkpoint_path):
+        return 0
+
+    with open(checkpoint_path, encoding="utf-8") as checkpoint_file:
+        checkpoint = json.load(checkpoint_file)
+
+    manifest_stat = os.stat(manifest_path)
+    expected = {"manifest": os.path.abspath(manifest_path), "manifest_size": manifest_stat.st_size,
+                "manifest_mtime_ns": manifest_stat.st_mtime_ns, "shard": list(shard)}
+    if any(checkpoint.get(key) != value for key, value in expected.items()):
+        raise ValueError(f"Checkpoint '{checkpoint_path}' belongs to a different manifest or shard (use --restart).")
+    return checkpoint["rows_done"]
+
+def save_checkpoint(checkpoint_path, manifest_path, shard, rows_done):
+    """ Atomically records that the first `rows_done` manifest rows have been applied. """
+    manifest_stat = os.stat(manifest_path)
+    temporary_path = f"{checkpoint_path}.tmp"
+    with open(temporary_path, "w", encoding="utf-8") as checkpoint_file:
+        json.dump({"manifest": os.path.abspath(manifest_path), "manifest_size": manifest_stat.st_size,
+                   "manifest_mtime_ns": manifest_stat.st_mtime_ns, "shard": list(shard), "rows_done": rows_done},
+                  checkpoint_file)
+    os.replace(temporary_path, checkpoint_path)
+
+def apply_manifest(manifest_path, manifest_type=None, shard=(0, 1), checkpoint_path=None, restart=False,
+                   batch_size=DEFAULT_BATCH_SIZE, library_index=None, jobs=1, report_path=None):
+    """
+    Streams a manifest back in and writes its tags in batches of `batch_size` rows.
+    Only rows in this shard are written; after every batch the checkpoint records how far the manifest has been
+    applied, so an interrupted run resumes after the last completed batch.
+    """
+    checkpoint_path = checkpoint_path or f"{manifest_path}.shard{shard[0]}of{shard[1]}.checkpoint"
+    rows_done = 0 if restart else load_checkpoint(checkpoint_path, manifest_path, shard)
+    if rows_done:
+        print(f"Resuming after row {rows_done} (checkpoint: {checkpoint_path})")
+
+    with TagWritePipeline(library_index, jobs, report_path, append_report=rows_done > 0) as pipeline:
+        batch_end = rows_done
+        for row_number, path, tags in iter_manifest(manifest_path, manifest_type):
+            if row_number < rows_done:
+                continue
+
+            if in_shard(path, shard):
+                pipeline.submit(path, tags)
+            batch_end = row_number + 1
+
+            if batch_end - rows_done >= batch_size:
+                pipeline.drain()
+                rows_done = batch_end
+                save_checkpoint(checkpoint_path, manifest_path, shard, rows_done)
+
+        pipeline.drain()
+        save_checkpoint(checkpoint_path, manifest_path, shard, batch_end)
+
+    print_write_summary(pipeline.results, pipeline.bytes_written, library_index)
+
+def main():
+    commands = ("write", "parse-only", "export", "apply")
+    argv = sys.argv[1:]
+    if not argv or argv[0] not in commands + ("-h", "--help"):
+        argv = ["write"] + argv  # "meta-write.py <directory>" keeps working
 
-if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Extract metadata from filenames and embed it into music files.")
-    parser.add_argument("directory", help="Directory containing music files.")
-    args = parser.parse_args()
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    write_parser = subparsers.add_parser("write", help="Write metadata parsed from filenames into the files (default).")
+    write_parser.add_argument("directory", nargs="?", help="Directory containing music files.")
+    write_parser.add_argument("--jobs", type=int, default=1, help="Number of threads writing tags (default: 1).")
+    write_parser.add_argument("--report", help="Write a JSONL report of applied, skipped, unparseable and failed files.")
+    write_parser.add_argument("--retry", metavar="REPORT", help="Only process the files marked as failed in a previous --report.")
+    write_parser.add_argument("--index", help="SQLite library index used to skip files that are already tagged (shared with music-renamer.py).")
+    write_parser.add_argument("--rebuild-index", action="store_true", help="Discard the library index and rewrite every file.")
+
+    parse_parser = subparsers.add_parser("parse-only", help="Stream path-to-metadata results as JSONL without touching the files.")
+    parse_parser.add_argument("paths", nargs="*", help="Directories, audio files, or - to read paths from stdin.")
+    parse_parser.add_argument("--output", help="Write JSONL to this file instead of stdout.")
+    parse_parser.add_argument("--benchmark", type=int, metavar="FILENAMES", help="Compare the legacy and single-pass parsers on a synthetic corpus.")
+
+    export_parser = subparsers.add_parser("export", help="Stream a CSV or JSONL manifest of paths and proposed tags.")
+    export_parser.add_argument("paths", nargs="+", help="Directories, audio files, or - to read paths from stdin.")
+    export_parser.add_argument("--output", help="Manifest file (default: stdout); a .csv name selects CSV.")
+    export_parser.add_argument("--format", choices=("csv", "jsonl"), help="Manifest format (default: from --output, else jsonl).")
+
+    apply_parser = subparsers.add_parser("apply", help="Write the tags from a (reviewed) manifest, restartable and shardable.")
+    apply_parser.add_argument("manifest", help="CSV or JSONL manifest produced by export.")
+    apply_parser.add_argument("--format", choices=("csv", "jsonl"), help="Manifest format (default: from the file extension).")
+    apply_parser.add_argument("--shard", type=parse_shard, default=(0, 1), metavar="i/N", help="Only apply shard i of N (0-based), e.g. 0/4 on the first of four machines.")
+    apply_parser.add_argument("--checkpoint", help="Checkpoint file (default: <manifest>.shard<i>of<N>.checkpoint).")
+    apply_parser.add_argument("--restart", action="store_true", help="Ignore an existing checkpoint and start from the first row.")
+    apply_parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, help=f"Manifest rows per batch and checkpoint (default: {DEFAULT_BATCH_SIZE}).")
+    apply_parser.add_argument("--jobs", type=int, default=1, help="Number of threads writing tags (default: 1).")
+    apply_parser.add_argument("--report", help="Write a JSONL report of applied, skipped, unparseable and failed files.")
+    apply_parser.add_argument("--index", help="SQLite library index used to skip files that are already tagged (shared with music-renamer.py).")
 
-    if os.path.isdir(args.directory):
-        process_files_in_directory(args.directory)
+    args = parser.parse_args(argv)
+
+    if args.command == "export":
+        export_manifest(args.paths, args.output, args.format)
+        return
+
+    if args.command == "apply":
+        if not os.path.isfile(args.manifest):
+            print(f"Manifest '{args.manifest}' not found.")
+            return
+
+        library_index = LibraryIndex(args.index) if args.index else None
+        try:
+            apply_manifest(args.manifest, args.format, args.shard, args.checkpoint, args.restart,
+                           max(1, args.batch_size), library_index, max(1, args.jobs), args.report)
+        except ValueError as e:
+            print(f"Error: {e}")
+        finally:
+            if library_index is not None:
+                library_index.close()
+        return
+
+    if args.command == "parse-only":
+        if args.benchmark:
+            benchmark_parser(args.benchmark)
+        elif args.paths:
+            parse_only(args.paths, args.output)
+        else:
+            parse_parser.error("give at least one path (or - for stdin), or --benchmark")
+        return
+
+    if args.rebuild_index and not args.index:
+        write_parser.error("--rebuild-index requires --index")
+
+    if bool(args.directory) == bool(args.retry):
+        write_parser.error("give either a directory or --retry REPORT")
+
+    if args.retry and not os.path.isfile(args.retry):
+        print(f"Report '{args.retry}' not found.")
+    elif args.directory and not os.path.isdir(args.directory):
+        print("Invalid directory. Please enter a valid path.")
     else:
-        print("Invalid directory. Please enter a valid path.")
\ No newline at end of file
+        library_index = LibraryIndex(args.index) if args.index else None
+        if library_index is not None and args.rebuild_index:
+            library_index.clear()
+
+        try:
+            if args.retry:
+                # Read the whole report first, so --report may point at the same file
+                results, bytes_written = process_files(list(iter_report_paths(args.retry)), library_index,
+                                                       max(1, args.jobs), args.report)
+                print_write_summary(results, bytes_written, library_index)
+            else:
+                process_files_in_directory(args.directory, library_index, max(1, args.jobs), args.report)
+        finally:
+            if library_index is not None:
+                library_index.close()
+
+if __name__ == "__main__":
+    main()
@@ -40,13 +40,213 @@ If a renamed file already exists, the original file is deleted to prevent duplic
 
 The script utilizes threading to enhance processing speed.
 
+Checksum Index:
+Pass --index <file> to keep a persistent SQLite index of computed checksums.
+Entries are keyed by device, inode, size and modification time (ns), so files
+that have not changed since the last run are renamed without being re-read.
+
+python checksum-rename.py /path/to/directory --index ~/.checksum-index.sqlite
+python checksum-rename.py /path/to/directory --index ~/.checksum-index.sqlite --verify-index
+python checksum-rename.py /path/to/directory --index ~/.checksum-index.sqlite --rebuild-index
+python checksum-rename.py /path/to/directory --index ~/.checksum-index.sqlite --prune-index
+
+--verify-index re-hashes every file and reports index entries that no longer
+match (without renaming anything); --rebuild-index discards the index and
+hashes every file again; --prune-index removes entries for files that were not
+seen during the run (deleted, or rewritten as a new inode). Entries are keyed
+by inode rather than path, so only prune an index used for a single directory.
+
+Device Scheduling:
+Files are grouped by the device they live on. Each device gets its own worker
+pool sized for the storage type (SSDs run wide, spinning and removable disks
+run narrow) and reads are issued in inode order within each device to limit
+seeking. Per-device throughput is shown in the progress bar.
+
+python checksum-rename.py /path/to/directory --hdd-workers 2 --ssd-workers 16
+python checksum-rename.py /path/to/directory --no-device-scheduling
+python checksum-rename.py /path/to/directory --benchmark-io
+
+--benchmark-io hashes the tree with the naive and the device-aware strategies
+(without renaming anything) and prints the throughput of each.
+
+Plan / Apply:
+Renames run in two phases. The planning phase hashes every file and resolves
+duplicates and already-named files against an in-memory index of each
+directory's names (one listing per directory, no per-file existence checks).
+The apply phase then renames and deletes directory by directory.
+
+python checksum-rename.py /path/to/directory --dry-run --plan-file plan.jsonl
+python checksum-rename.py /path/to/directory --apply-plan plan.jsonl
+
+--dry-run only plans; --plan-file writes the plan as JSONL (one operation per
+line); --apply-plan applies a saved plan, skipping files that changed since.
+
+Duplicate Finder:
+--dedupe-only finds duplicate files across one or more roots without renaming
+anything. Files are grouped by size, unique sizes are dropped, the first and
+last 64 KB of the remaining files are hashed, and only files whose partial
+hashes collide are hashed in full. Duplicate sets are written to a JSONL
+report, or resolved by replacing copies with hardlinks or reflinks.
+
+python checksum-rename.py /archive/a /archive/b --dedupe-only --dedupe-report duplicates.jsonl
+python checksum-rename.py /archive/a /archive/b --dedupe-only --link reflink
+
+Watch Mode:
+--watch keeps running and renames files as they land, instead of walking the
+whole tree on every run. On Linux it uses inotify (close-write and moved-to
+events); elsewhere, or with --force-polling, it rescans the tree every
+--poll-interval seconds. A file is only processed once it has been quiet for
+--debounce seconds, so files still being written are left alone.
+
+python checksum-rename.py /data/ingest --length 12 --watch --debounce 2 --index ~/.checksum-index.sqlite
+
+Hash Engines:
+The digest algorithm, read buffer size and read strategy are configurable.
+Available engines are shake_128 (default), blake2b, blake2s and, when the
+optional `xxhash` module is installed, the non-cryptographic xxh3_128.
+
+python checksum-rename.py /path/to/directory --algorithm blake2b --buffer-size 1024 --read-mode mmap
+python checksum-rename.py /path/to/directory --benchmark
+
+--benchmark hashes a sample of the tree with every engine, buffer size and
+read mode, then recommends the fastest combination for this host.
+
 """
+import argparse
+import ctypes
+import ctypes.util
 import hashlib
+import json
+import mmap
 import os
+import queue
+import select
+import shutil
+import sqlite3
+import stat
+import struct
 import sys
-from concurrent.futures import ThreadPoolExecutor
+import threading
+import time
+from collections import defaultdict
+from collections.abc import Callable, Iterable, Iterator
+from dataclasses import dataclass
+from functools import lru_cache, partial
 from tqdm import tqdm  # Progress bar
 
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..")))
+from fswalk import walk, walk_files  # Shared scandir-based walker (Filesystem_Tools/fswalk.py)
+
+try:
+    import xxhash  # Optional fast non-cryptographic hash
+except ImportError:
+    xxhash = None
+
+try:
+    import fcntl  # Reflink support (Linux)
+except ImportError:
+    fcntl = None
+
+INDEX_SCHEMA_VERSION = 2
+INDEX_COMMIT_INTERVAL = 1000  # Commit the index every N stored checksums
+PIPELINE_QUEUE_SIZE = 1024  # Maximum number of discovered files waiting for a worker
+DEFAULT_WORKERS = min(32, (os.cpu_count() or 1) + 4)  # Same default as ThreadPoolExecutor
+INODE_ORDER_WINDOW = 256  # Files buffered per device and sorted by inode before dispatch
+
+# Worker threads per device, by storage type
+DEVICE_WORKERS = {
+    "ssd": DEFAULT_WORKERS,
+    "hdd": 1,  # Spinning and removable disks: parallel reads only add seeks
+    "unknown": 4,  # Network filesystems, virtual devices and non-Linux hosts
+}
+
+DEFAULT_BUFFER_SIZE = 128 * 1024  # 128 KB read buffer
+READ_MODES = ("read", "readinto", "mmap")
+BENCHMARK_BUFFER_SIZES = (64 * 1024, 128 * 1024, 1024 * 1024, 4 * 1024 * 1024)
+BENCHMARK_SAMPLE_FILES = 200  # Maximum number of files hashed per benchmark run
+BENCHMARK_SAMPLE_BYTES = 256 * 1024 * 1024  # Maximum sample size in bytes
+PARTIAL_HASH_EDGE = 64 * 1024  # Bytes hashed from each end of a file by the duplicate prefilter
+FICLONE = 0x40049409  # Linux ioctl that clones a file's extents (reflink)
+LINK_MODES = ("hardlink", "reflink")
+
+# inotify event flags (see inotify(7))
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+INOTIFY_WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+INOTIFY_EVENT_HEADER = struct.Struct("iIII")  # wd, mask, cookie, name length
+TEMPORARY_SUFFIXES = (".renaming", ".linking")  # Names used while plans and links are applied
+
+@dataclass(frozen=True)
+class HashEngine:
+    """
+    A digest algorithm usable for checksum filenames.
+
+    - new(digest_length) returns a hasher, finish(hasher, digest_length) its hex digest.
+    - Prefix-safe engines produce digests whose shorter lengths are prefixes of longer ones.
+    """
+    name: str
+    new: Callable[[int], object]
+    finish: Callable[[object, int], str]
+    max_digest_length: int | None = None
+    prefix_safe: bool = True
+
+HASH_ENGINES = {
+    "shake_128": HashEngine("shake_128", lambda length: hashlib.shake_128(),
+                            lambda hasher, length: hasher.hexdigest(length)),
+    "blake2b": HashEngine("blake2b", lambda length: hashlib.blake2b(digest_size=length),
+                          lambda hasher, length: hasher.hexdigest(), max_digest_length=64, prefix_safe=False),
+    "blake2s": HashEngine("blake2s", lambda length: hashlib.blake2s(digest_size=length),
+                          lambda hasher, length: hasher.hexdigest(), max_digest_length=32, prefix_safe=False),
+}
+
+if xxhash is not None:
+    HASH_ENGINES["xxh3_128"] = HashEngine("xxh3_128", lambda length: xxhash.xxh3_128(),
+                                          lambda hasher, length: hasher.hexdigest()[:length * 2], max_digest_length=16)
+
+@dataclass(frozen=True)
+class HashOptions:
+    """How files are hashed: digest engine, read buffer size and read strategy."""
+    engine: str = "shake_128"
+    buffer_size: int = DEFAULT_BUFFER_SIZE
+    read_mode: str = "readinto"
+
+DEFAULT_HASH_OPTIONS = HashOptions()
+
+def calculate_checksum(file_path: str, digest_length: int = 12, hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> str:
+    """
+    Computes the checksum of the specified file with the configured engine and read strategy.
+
+    - "read" reads each chunk into a new bytes object.
+    - "readinto" reuses a single buffer for every chunk.
+    - "mmap" maps the whole file and hashes it in one call (empty files fall back to "readinto").
+
+    :param file_path: Absolute path of the file to compute checksum for.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param hash_options: Digest engine, buffer size and read mode.
+    :return: Hexadecimal checksum string.
+    """
+    engine = HASH_ENGINES[hash_options.engine]
+    hasher = engine.new(digest_length)
+
+    with open(file_path, 'rb', buffering=0) as file:
+        if hash_options.read_mode == "mmap" and os.fstat(file.fileno()).st_size > 0:
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mapped_file:
+                hasher.update(mapped_file)
+        elif hash_options.read_mode == "read":
+            while chunk := file.read(hash_options.buffer_size):
+                hasher.update(chunk)
+        else:
+            buffer = bytearray(hash_options.buffer_size)
+            view = memoryview(buffer)
+            while bytes_read := file.readinto(buffer):
+                hasher.update(view[:bytes_read])
+
+    return engine.finish(hasher, digest_length)
+
 def calculate_shake128_checksum(file_path: str, digest_length: int = 12) -> str:
     """
     Computes the SHAKE-128 checksum of the specified file.
@@ -55,94 +255,1472 @@ def calculate_shake128_checksum(file_path: str, digest_length: int = 12) -> str:
     :param digest_length: Number of bytes for the SHAKE-128 digest (default: 12).
     :return: Hexadecimal SHAKE-128 checksum string.
     """
-    shake128_hasher = hashlib.shake_128()
-    
-    # Read file in chunks to efficiently process large files
-    with open(file_path, 'rb') as file:
-        while chunk := file.read(128 * 1024):  # 128 KB buffer
-            shake128_hasher.update(chunk)
-    
-    return shake128_hasher.hexdigest(digest_length)
+    return calculate_checksum(file_path, digest_length, DEFAULT_HASH_OPTIONS)
+
+class ChecksumIndex:
+    """
+    Persistent SQLite index of previously computed checksums.
+
+    - Entries are keyed by (device, inode) and only trusted while the file's size
+      and mtime_ns are unchanged and the hash engine matches, so renamed files keep
+      their cached checksum.
+    - For prefix-safe engines such as SHAKE-128, a stored digest also answers any shorter request.
+    - Remembers which files were looked up, so prune() can drop entries for files that are gone.
+    - Safe to share between worker threads.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = os.path.abspath(index_path)
+        self.reused = 0  # Checksums served from the index
+        self.computed = 0  # Checksums calculated from file contents
+        self._pending_writes = 0
+        self._seen = set()  # (device, inode) of every file looked up during this run
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.index_path, check_same_thread=False)
+
+        # Recreate the table if it was written by an incompatible version
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_SCHEMA_VERSION:
+            self._connection.execute("DROP TABLE IF EXISTS checksums")
+            self._connection.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS checksums ("
+            "device INTEGER NOT NULL, inode INTEGER NOT NULL, size INTEGER NOT NULL, "
+            "mtime_ns INTEGER NOT NULL, algorithm TEXT NOT NULL, digest_length INTEGER NOT NULL, checksum TEXT NOT NULL, "
+            "PRIMARY KEY (device, inode))"
+        )
+        self._connection.commit()
+
+    def owns_path(self, file_path: str) -> bool:
+        """Returns True for the index database and its SQLite journal files."""
+        return os.path.abspath(file_path) in (self.index_path, f"{self.index_path}-journal",
+                                              f"{self.index_path}-wal", f"{self.index_path}-shm")
+
+    def _is_current(self, row: tuple, file_stat: os.stat_result, digest_length: int, engine: str) -> bool:
+        """Returns True if an index row still describes the file and can answer the request."""
+        size, mtime_ns, algorithm, stored_length, _ = row
+        if size != file_stat.st_size or mtime_ns != file_stat.st_mtime_ns or algorithm != engine:
+            return False
+
+        if HASH_ENGINES[engine].prefix_safe:
+            return stored_length >= digest_length
+        return stored_length == digest_length
+
+    def _fetch(self, file_stat: os.stat_result) -> tuple | None:
+        """Returns the index row for a file's inode and marks the file as seen (caller must hold the lock)."""
+        self._seen.add((file_stat.st_dev, file_stat.st_ino))
+        return self._connection.execute(
+            "SELECT size, mtime_ns, algorithm, digest_length, checksum FROM checksums WHERE device = ? AND inode = ?",
+            (file_stat.st_dev, file_stat.st_ino)).fetchone()
+
+    def lookup(self, file_stat: os.stat_result, digest_length: int, engine: str = "shake_128") -> str | None:
+        """
+        Returns the cached checksum for a file, or None if it is missing or stale.
+
+        :param file_stat: Result of os.stat() for the file.
+        :param digest_length: Number of bytes requested for the digest.
+        :param engine: Name of the hash engine in HASH_ENGINES.
+        """
+        with self._lock:
+            row = self._fetch(file_stat)
+            if row is None or not self._is_current(row, file_stat, digest_length, engine):
+                return None
+
+            self.reused += 1
+            return row[-1][:digest_length * 2]
+
+    def store(self, file_stat: os.stat_result, digest_length: int, checksum: str, engine: str = "shake_128") -> None:
+        """
+        Records the checksum of a file, replacing any previous entry for its inode.
+
+        :param file_stat: Result of os.stat() taken *before* the file was hashed.
+        :param digest_length: Number of bytes in the digest.
+        :param checksum: Hexadecimal checksum string.
+        :param engine: Name of the hash engine in HASH_ENGINES.
+        """
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO checksums VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (file_stat.st_dev, file_stat.st_ino, file_stat.st_size,
+                 file_stat.st_mtime_ns, engine, digest_length, checksum))
+            self.computed += 1
+            self._pending_writes += 1
+            if self._pending_writes >= INDEX_COMMIT_INTERVAL:
+                self._connection.commit()
+                self._pending_writes = 0
+
+    def verify(self, file_path: str, digest_length: int, hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> str:
+        """
+        Re-hashes a file and compares it against its index entry without updating the index.
+
+        :return: "valid", "stale" (size/mtime/engine changed or too short), "missing" or "mismatch".
+        """
+        file_stat = os.stat(file_path)
+        with self._lock:
+            row = self._fetch(file_stat)
+
+        if row is None:
+            return "missing"
+
+        if not self._is_current(row, file_stat, digest_length, hash_options.engine):
+            return "stale"
+
+        stored_length, stored_checksum = row[-2:]
+        checksum = calculate_checksum(file_path, stored_length, hash_options)
+        return "valid" if checksum == stored_checksum else "mismatch"
+
+    def flush(self) -> None:
+        """Commits pending entries without closing the database."""
+        with self._lock:
+            self._connection.commit()
+            self._pending_writes = 0
+
+    def prune(self) -> int:
+        """
+        Removes entries for files that were not looked up during this run and returns how many were removed.
+        Entries are keyed by inode, not path, so only call this after a full run over every file the index covers.
+        """
+        with self._lock:
+            keys = self._connection.execute("SELECT device, inode FROM checksums").fetchall()
+            stale = [key for key in keys if key not in self._seen]
+            self._connection.executemany("DELETE FROM checksums WHERE device = ? AND inode = ?", stale)
+            self._connection.commit()
+            self._pending_writes = 0
+        return len(stale)
+
+    def clear(self) -> None:
+        """Removes every entry from the index."""
+        with self._lock:
+            self._connection.execute("DELETE FROM checksums")
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Commits pending entries and closes the database."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+def get_file_checksum(file_path: str, digest_length: int = 12, checksum_index: ChecksumIndex | None = None,
+                      hash_options: HashOptions = DEFAULT_HASH_OPTIONS, file_stat: os.stat_result | None = None) -> str:
+    """
+    Returns the checksum of a file, consulting the checksum index first if one is given.
 
-def rename_file_to_checksum(file_path: str, digest_length: int = 12) -> None:
+    :param file_path: Absolute path of the file to compute checksum for.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param checksum_index: Optional persistent index of previously computed checksums.
+    :param hash_options: Digest engine, buffer size and read mode.
+    :param file_stat: Result of os.stat() taken before hashing, if the caller already has one.
+    :return: Hexadecimal checksum string.
+    """
+    if checksum_index is None:
+        return calculate_checksum(file_path, digest_length, hash_options)
+
+    # Stat before hashing so a write during hashing invalidates the entry on the next run
+    if file_stat is None:
+        file_stat = os.stat(file_path)
+    checksum = checksum_index.lookup(file_stat, digest_length, hash_options.engine)
+    if checksum is not None:
+        return checksum
+
+    checksum = calculate_checksum(file_path, digest_length, hash_options)
+    checksum_index.store(file_stat, digest_length, checksum, hash_options.engine)
+    return checksum
+
+def rename_file_to_checksum(file_path: str, digest_length: int = 12, checksum_index: ChecksumIndex | None = None,
+                            hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> str | None:
     """
-    Renames a file using its SHAKE-128 checksum.
+    Renames a file using its checksum (SHAKE-128 unless another engine is configured).
 
     - If a file with the same checksum-based name already exists, the original file is deleted.
     - If the file is already named correctly, no action is taken.
+    - Symlinks are left alone, and a file is never deleted because a symlink holds its checksum-based name
+      (the link may point at the very file being processed).
 
     :param file_path: Absolute path of the file to rename.
-    :param digest_length: Number of bytes for the SHAKE-128 digest (default: 12).
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param checksum_index: Optional persistent index of previously computed checksums.
+    :param hash_options: Digest engine, buffer size and read mode.
+    :return: The file's checksum-based path, or None if it was deleted as a duplicate (the unchanged path for
+             symlinks and files whose target name is held by a symlink).
     """
+    if os.path.islink(file_path):
+        return file_path
+
     file_directory = os.path.dirname(file_path)
     file_extension = os.path.splitext(file_path)[1]  # Preserve file extension
 
-    checksum = calculate_shake128_checksum(file_path, digest_length)
+    checksum = get_file_checksum(file_path, digest_length, checksum_index, hash_options)
     new_filename = f"{checksum}{file_extension}"
     new_file_path = os.path.join(file_directory, new_filename)
 
     # If the file is already named correctly, do nothing
     if os.path.basename(file_path) == new_filename:
-        return
+        return file_path
 
     # If a file with the target name exists, delete the current file
-    if os.path.exists(new_file_path):
+    if os.path.lexists(new_file_path):
+        if os.path.islink(new_file_path):
+            return file_path
         os.remove(file_path)
-    else:
-        os.rename(file_path, new_file_path)
+        return None
+
+    os.rename(file_path, new_file_path)
+    return new_file_path
+
+def iter_file_entries(directory_path: str, checksum_index: ChecksumIndex | None = None) -> Iterator[os.DirEntry]:
+    """
+    Lazily yields the DirEntry of every regular file in the directory tree, skipping the checksum index's own files.
+
+    - Symlinks are skipped: they hash like their target, so treating them as files could keep a link
+      and delete the data it points to.
+
+    :param directory_path: Path to the target folder containing files to process.
+    :param checksum_index: Optional checksum index whose database must not be renamed.
+    :return: Iterator of file DirEntry objects.
+    """
+    for entry in walk_files(directory_path):
+        if entry.is_symlink():
+            continue
+        if checksum_index is None or not checksum_index.owns_path(entry.path):
+            yield entry
+
+def iter_files(directory_path: str, checksum_index: ChecksumIndex | None = None) -> Iterator[str]:
+    """
+    Lazily yields all regular files in the directory tree, skipping the checksum index's own files.
+
+    :param directory_path: Path to the target folder containing files to process.
+    :param checksum_index: Optional checksum index whose database must not be renamed.
+    :return: Iterator of file paths.
+    """
+    for entry in iter_file_entries(directory_path, checksum_index):
+        yield entry.path
+
+@lru_cache(maxsize=None)
+def classify_device(device_id: int) -> tuple[str, str]:
+    """
+    Identifies the block device behind a st_dev value using Linux sysfs.
+
+    :param device_id: The st_dev field of a file's stat result.
+    :return: Tuple of (device name, storage type), where storage type is "ssd", "hdd" or "unknown".
+    """
+    if not hasattr(os, "major"):
+        return str(device_id), "unknown"
+
+    device_name = f"{os.major(device_id)}:{os.minor(device_id)}"
+    sysfs_path = f"/sys/dev/block/{device_name}"
+    if not os.path.exists(sysfs_path):
+        return device_name, "unknown"
+
+    # Partitions keep their queue settings on the parent disk
+    device_path = os.path.realpath(sysfs_path)
+    for disk_path in (device_path, os.path.dirname(device_path)):
+        try:
+            with open(os.path.join(disk_path, "queue", "rotational")) as rotational_file:
+                rotational = rotational_file.read().strip() == "1"
+        except OSError:
+            continue
+
+        try:
+            with open(os.path.join(disk_path, "removable")) as removable_file:
+                removable = removable_file.read().strip() == "1"
+        except OSError:
+            removable = False
+
+        return os.path.basename(device_path), "hdd" if rotational or removable else "ssd"
+
+    return os.path.basename(device_path), "unknown"
+
+class DeviceLane:
+    """
+    Work queue and throughput counters for the files of a single device.
+
+    - Files are buffered in a small window and dispatched in inode order.
+    """
+
+    def __init__(self, name: str, worker_count: int, order_by_inode: bool = True):
+        self.name = name
+        self.worker_count = worker_count
+        self.order_by_inode = order_by_inode
+        self.file_queue = queue.Queue(maxsize=PIPELINE_QUEUE_SIZE)
+        self.bytes_processed = 0
+        self.started = time.monotonic()
+        self._window = []
+
+    def add(self, file_path: str, file_stat: os.stat_result) -> None:
+        """Buffers a file, dispatching the window once it is full."""
+        self._window.append((file_stat.st_ino, file_path, file_stat))
+        if len(self._window) >= INODE_ORDER_WINDOW or not self.order_by_inode:
+            self.flush()
+
+    def flush(self) -> None:
+        """Dispatches all buffered files to the lane's workers."""
+        if self.order_by_inode:
+            self._window.sort()
+        for entry in self._window:
+            self.file_queue.put(entry)
+        self._window.clear()
+
+    def close(self) -> None:
+        """Dispatches remaining files followed by one end marker per worker."""
+        self.flush()
+        for _ in range(self.worker_count):
+            self.file_queue.put(None)
+
+    def throughput(self) -> float:
+        """Returns the lane's throughput in MB/s since it was created."""
+        elapsed = time.monotonic() - self.started
+        return self.bytes_processed / (1024 * 1024) / elapsed if elapsed > 0 else 0.0
+
+def run_file_pipeline(file_paths: Iterable[str | os.DirEntry], worker: Callable[..., object], description: str,
+                      on_result: Callable[[str, object], None] | None = None,
+                      schedule_devices: bool = True, device_workers: dict[str, int] | None = None,
+                      pass_stat: bool = False) -> int:
+    """
+    Streams file paths from the directory walk through per-device pools of worker threads.
+
+    - The walker feeds bounded queues, so memory stays flat regardless of tree size.
+    - Workers start as soon as the first file is discovered.
+    - The progress bar total grows as the walker discovers files.
+    - With device scheduling, each st_dev gets its own pool sized by storage type and
+      files are read in inode order; otherwise a single shared pool reads in walk order.
+    - A failing file is reported and skipped without stopping the pipeline.
+
+    :param file_paths: Iterable of file paths or DirEntry objects (whose stat cache is reused), consumed on the calling thread.
+    :param worker: Function called with each file path on a worker thread.
+    :param description: Progress bar label.
+    :param on_result: Optional callback receiving (file_path, result), called under a lock.
+    :param schedule_devices: Group files by device instead of using one shared pool.
+    :param device_workers: Worker threads per storage type (defaults to DEVICE_WORKERS).
+    :param pass_stat: Also pass the walker's stat result to the worker, as worker(file_path, file_stat).
+    :return: Number of files discovered by the walker.
+    """
+    device_workers = {**DEVICE_WORKERS, **(device_workers or {})}
+    progress_lock = threading.Lock()
+    lanes = {}
+    worker_threads = []
+
+    progress_bar = tqdm(total=0, desc=description, unit="file")
+
+    def consume(lane: DeviceLane) -> None:
+        while (entry := lane.file_queue.get()) is not None:
+            _, file_path, file_stat = entry
+            try:
+                result = worker(file_path, file_stat) if pass_stat else worker(file_path)
+            except Exception as e:
+                tqdm.write(f"Error processing {file_path}: {e}")
+                result = None
+            else:
+                if on_result is not None:
+                    with progress_lock:
+                        on_result(file_path, result)
+
+            with progress_lock:
+                lane.bytes_processed += file_stat.st_size
+                progress_bar.set_postfix_str(
+                    ", ".join(f"{lane.name}: {lane.throughput():.1f} MB/s" for lane in lanes.values()),
+                    refresh=False)
+                progress_bar.update(1)
+
+    def get_lane(device_id: int | None) -> DeviceLane:
+        lane = lanes.get(device_id)
+        if lane is None:
+            if device_id is None:
+                lane = DeviceLane("all", DEFAULT_WORKERS, order_by_inode=False)
+            else:
+                device_name, storage_type = classify_device(device_id)
+                lane = DeviceLane(f"{device_name} ({storage_type})", device_workers[storage_type])
+            with progress_lock:
+                lanes[device_id] = lane
+
+            for _ in range(lane.worker_count):
+                thread = threading.Thread(target=consume, args=(lane,), daemon=True)
+                thread.start()
+                worker_threads.append(thread)
+        return lane
+
+    # The calling thread walks the tree while the lane workers hash
+    try:
+        for file_path in file_paths:
+            try:
+                if isinstance(file_path, os.DirEntry):
+                    file_stat = file_path.stat()
+                    file_path = file_path.path
+                else:
+                    file_stat = os.stat(file_path)
+            except OSError as e:
+                tqdm.write(f"Error processing {file_path}: {e}")
+                continue
+
+            lane = get_lane(file_stat.st_dev if schedule_devices else None)
+            with progress_lock:
+                progress_bar.total += 1
+            lane.add(file_path, file_stat)
+    finally:
+        for lane in list(lanes.values()):
+            lane.close()
+        for thread in worker_threads:
+            thread.join()
+        progress_bar.close()
+
+    return progress_bar.total
+
+def evict_from_page_cache(file_path: str) -> None:
+    """Asks the kernel to drop a file's cached pages so benchmark reads hit the disk."""
+    if not hasattr(os, "posix_fadvise"):
+        return
+
+    try:
+        file_descriptor = os.open(file_path, os.O_RDONLY)
+    except OSError:
+        return
+
+    try:
+        os.posix_fadvise(file_descriptor, 0, 0, os.POSIX_FADV_DONTNEED)
+    finally:
+        os.close(file_descriptor)
+
+def benchmark_io_strategies(directory_path: str, digest_length: int = 12,
+                            device_workers: dict[str, int] | None = None,
+                            hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> None:
+    """
+    Hashes the directory tree with the naive and the device-aware strategies and compares them.
+
+    - Files are not renamed and no checksum index is used.
+    - Cached pages are evicted before each run (where supported) so both strategies read from disk.
+
+    :param directory_path: Path to the folder to benchmark.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param device_workers: Worker threads per storage type (defaults to DEVICE_WORKERS).
+    :param hash_options: Digest engine, buffer size and read mode.
+    """
+    hash_worker = partial(calculate_checksum, digest_length=digest_length, hash_options=hash_options)
+    results = {}
+
+    for strategy, schedule_devices in (("naive", False), ("scheduled", True)):
+        for file_path in iter_files(directory_path):
+            evict_from_page_cache(file_path)
+
+        start_time = time.monotonic()
+        file_count = run_file_pipeline(iter_file_entries(directory_path), hash_worker, f"Benchmark ({strategy})",
+                                       schedule_devices=schedule_devices, device_workers=device_workers)
+        results[strategy] = time.monotonic() - start_time
+
+        if not file_count:
+            print("No files found in the specified directory.")
+            return
+
+    total_bytes = sum(entry.stat().st_size for entry in iter_file_entries(directory_path))
+    total_mb = total_bytes / (1024 * 1024)
+
+    print(f"Benchmarked {file_count} files ({total_mb:.2f} MB)")
+    for strategy, elapsed in results.items():
+        print(f"  {strategy:<10} {elapsed:8.2f} s  {total_mb / elapsed if elapsed > 0 else 0.0:10.1f} MB/s")
+
+def benchmark_hash_engines(directory_path: str, digest_length: int = 12) -> None:
+    """
+    Hashes a sample of the directory tree with every engine, buffer size and read mode.
+
+    - Runs single-threaded on a warm page cache, so it measures hashing and copying cost rather than disk speed.
+    - Prints the throughput of each combination and recommends the fastest.
+
+    :param directory_path: Path to the folder to sample files from.
+    :param digest_length: Number of bytes for the digest (clamped to each engine's maximum).
+    """
+    sample = []
+    sample_bytes = 0
+    for entry in iter_file_entries(directory_path):
+        if len(sample) >= BENCHMARK_SAMPLE_FILES or sample_bytes >= BENCHMARK_SAMPLE_BYTES:
+            break
+        try:
+            sample_bytes += entry.stat().st_size
+        except OSError:
+            continue
+        sample.append(entry.path)
+
+    if not sample:
+        print("No files found in the specified directory.")
+        return
+
+    # Warm the page cache so every combination reads the same cached data
+    for file_path in sample:
+        calculate_checksum(file_path, digest_length)
+
+    candidates = [HashOptions(engine, buffer_size, read_mode)
+                  for engine in HASH_ENGINES
+                  for read_mode in READ_MODES
+                  for buffer_size in (BENCHMARK_BUFFER_SIZES if read_mode != "mmap" else (DEFAULT_BUFFER_SIZE,))]
+
+    sample_mb = sample_bytes / (1024 * 1024)
+    results = []
+    for hash_options in tqdm(candidates, desc="Benchmarking Engines", unit="run"):
+        engine = HASH_ENGINES[hash_options.engine]
+        length = min(digest_length, engine.max_digest_length or digest_length)
+
+        start_time = time.perf_counter()
+        for file_path in sample:
+            calculate_checksum(file_path, length, hash_options)
+        elapsed = time.perf_counter() - start_time
+
+        results.append((sample_mb / elapsed if elapsed > 0 else 0.0, hash_options))
+
+    results.sort(key=lambda result: result[0], reverse=True)
+
+    print(f"Sampled {len(sample)} files ({sample_mb:.2f} MB)")
+    print(f"  {'engine':<10} {'read mode':<9} {'buffer':>8} {'MB/s':>10}")
+    for throughput, hash_options in results:
+        buffer_label = "-" if hash_options.read_mode == "mmap" else f"{hash_options.buffer_size // 1024} KB"
+        print(f"  {hash_options.engine:<10} {hash_options.read_mode:<9} {buffer_label:>8} {throughput:10.1f}")
+
+    fastest = results[0][1]
+    recommendation = f"--algorithm {fastest.engine} --read-mode {fastest.read_mode}"
+    if fastest.read_mode != "mmap":
+        recommendation += f" --buffer-size {fastest.buffer_size // 1024}"
+    print(f"Recommended: {recommendation}")
+
+def plan_file_rename(file_path: str, file_stat: os.stat_result | None = None, digest_length: int = 12,
+                     checksum_index: ChecksumIndex | None = None,
+                     hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> tuple[str, int, int] | None:
+    """
+    Computes the checksum-based name of a file without touching the directory.
+
+    :param file_path: Absolute path of the file to plan.
+    :param file_stat: Result of os.stat() taken before hashing (the walker's cached stat); stat'ed here if not given.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param checksum_index: Optional persistent index of previously computed checksums.
+    :param hash_options: Digest engine, buffer size and read mode.
+    :return: Tuple of (target name, size, mtime_ns), or None if the file is already named correctly.
+    :raises OSError: If the file changed while it was being hashed.
+    """
+    if file_stat is None:
+        file_stat = os.stat(file_path)
+
+    file_extension = os.path.splitext(file_path)[1]  # Preserve file extension
+    checksum = get_file_checksum(file_path, digest_length, checksum_index, hash_options, file_stat)
+    new_filename = f"{checksum}{file_extension}"
+
+    if os.path.basename(file_path) == new_filename:
+        return None
+
+    # The pre-hash size and mtime are recorded so a saved plan can detect files that changed before it was
+    # applied; a file written to while it was hashed would get a name that does not match its contents
+    current_stat = os.stat(file_path)
+    if (current_stat.st_size, current_stat.st_mtime_ns) != (file_stat.st_size, file_stat.st_mtime_ns):
+        raise OSError("file changed while it was being hashed")
+    return new_filename, file_stat.st_size, file_stat.st_mtime_ns
+
+def resolve_directory_plan(directory: str, pending: list[tuple[str, str, int, int]]) -> list[dict]:
+    """
+    Turns the planned names of one directory into rename and delete operations.
+
+    - A single listing of the directory seeds the index of taken names.
+    - Names held by files that are about to be renamed or deleted count as free.
+    - When several files share a target, the first (by name) is renamed and the rest are deleted as duplicates.
+
+    :param directory: Directory containing the files.
+    :param pending: List of (current name, target name, size, mtime_ns) for files needing a change.
+    :return: List of operation records.
+    """
+    try:
+        with os.scandir(directory) as entries:
+            taken_names = {entry.name for entry in entries}
+    except OSError as e:
+        tqdm.write(f"Error listing {directory}: {e}")
+        return []
+
+    taken_names -= {name for name, _, _, _ in pending}
+    operations = []
+
+    for name, target, size, mtime_ns in sorted(pending):
+        operation = {"directory": directory, "source": name, "target": target, "size": size, "mtime_ns": mtime_ns}
+        if target in taken_names:
+            operation["action"] = "delete"
+        else:
+            operation["action"] = "rename"
+            taken_names.add(target)
+        operations.append(operation)
+
+    return operations
+
+def plan_checksum_renames(directory_path: str, digest_length: int = 12, checksum_index: ChecksumIndex | None = None,
+                          schedule_devices: bool = True, device_workers: dict[str, int] | None = None,
+                          hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> tuple[list[dict], int]:
+    """
+    Planning phase: hashes every file and resolves the rename and delete operations in memory.
+
+    - Files that are already named correctly are counted but not kept in memory.
+
+    :param directory_path: Path to the target folder containing files to process.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param checksum_index: Optional persistent index of previously computed checksums.
+    :param schedule_devices: Group reads by device instead of using one shared pool.
+    :param device_workers: Worker threads per storage type (defaults to DEVICE_WORKERS).
+    :param hash_options: Digest engine, buffer size and read mode.
+    :return: Tuple of (operations grouped by directory, number of files found).
+    """
+    pending = defaultdict(list)
+
+    def record_plan(file_path: str, planned: tuple[str, int, int] | None) -> None:
+        if planned is not None:
+            pending[os.path.dirname(file_path)].append((os.path.basename(file_path), *planned))
+
+    plan_worker = partial(plan_file_rename, digest_length=digest_length, checksum_index=checksum_index,
+                          hash_options=hash_options)
+    file_count = run_file_pipeline(iter_file_entries(directory_path, checksum_index), plan_worker, "Hashing Files",
+                                   on_result=record_plan, schedule_devices=schedule_devices,
+                                   device_workers=device_workers, pass_stat=True)
+
+    operations = []
+    for directory in sorted(pending):
+        operations.extend(resolve_directory_plan(directory, pending.pop(directory)))
+
+    return operations, file_count
+
+def write_rename_plan(operations: Iterable[dict], plan_path: str) -> None:
+    """Writes plan operations to a JSONL file, one operation per line."""
+    with open(plan_path, "w", encoding="utf-8") as plan_file:
+        for operation in operations:
+            plan_file.write(json.dumps(operation, ensure_ascii=False) + "\n")
+
+def read_rename_plan(plan_path: str) -> Iterator[dict]:
+    """Lazily reads plan operations from a JSONL file."""
+    with open(plan_path, "r", encoding="utf-8") as plan_file:
+        for line in plan_file:
+            if line.strip():
+                yield json.loads(line)
+
+def drop_infeasible_operations(operations: list[dict], names: set[str]) -> list[dict]:
+    """
+    Marks the operations of one directory that cannot succeed and returns them.
+
+    - A rename needs its target to be free at the end: not an existing name, or the name of a file
+      that is itself renamed or deleted.
+    - A delete needs the kept copy (its target) to exist once the renames are done.
+    - Marking one operation can make others fail (e.g. p -> q waits for q -> r), so this repeats until stable.
+
+    :param operations: Operation records of one directory; infeasible ones get "infeasible": True.
+    :param names: Names currently in the directory.
+    :return: The newly marked operations.
+    """
+    dropped = []
+    changed = True
+    while changed:
+        changed = False
+        active = [operation for operation in operations if not operation.get("infeasible")]
+        freed = {operation["source"] for operation in active}
+        renamed_to = {operation["target"] for operation in active if operation["action"] == "rename"}
+
+        for operation in active:
+            target = operation["target"]
+            if operation["action"] == "rename":
+                feasible = target not in names or target in freed
+            else:
+                feasible = (target in names and target not in freed) or target in renamed_to
+            if not feasible:
+                operation["infeasible"] = True
+                dropped.append(operation)
+                changed = True
+
+    return dropped
+
+def apply_directory_plan(directory: str, operations: list[dict], results: dict[str, int],
+                         verify_sources: bool = False) -> None:
+    """
+    Apply phase for one directory: performs its renames, then its duplicate deletions.
+
+    - The directory is listed once; existence checks use that in-memory index.
+    - Renames and deletions are issued relative to a directory descriptor where supported.
+    - Operations that cannot succeed (target taken by a file that stays, or a duplicate whose kept copy will
+      not exist) are skipped before anything is moved, including renames that depend on them.
+    - Renames run once their target name is free. A file is only moved to a temporary name to break a cycle
+      or to free a name held by a duplicate awaiting deletion; if its own operation then fails, it is moved
+      back, and any temporary name that cannot be restored is reported.
+    - Duplicates are only deleted once the file they duplicate is in place.
+
+    :param directory: Directory containing the files.
+    :param operations: Operation records for this directory.
+    :param results: Counters updated with "renamed", "deleted" and "skipped".
+    :param verify_sources: Skip files whose size or mtime changed since planning (for saved plans).
+    """
+    try:
+        with os.scandir(directory) as entries:
+            entries_by_name = {entry.name: entry for entry in entries}
+    except OSError as e:
+        tqdm.write(f"Error listing {directory}: {e}")
+        results["skipped"] += len(operations)
+        return
+
+    use_directory_fd = os.rename in os.supports_dir_fd and os.unlink in os.supports_dir_fd
+    directory_fd = os.open(directory, os.O_RDONLY) if use_directory_fd else None
+
+    def rename(source: str, target: str) -> None:
+        if directory_fd is not None:
+            os.rename(source, target, src_dir_fd=directory_fd, dst_dir_fd=directory_fd)
+        else:
+            os.rename(os.path.join(directory, source), os.path.join(directory, target))
+
+    def delete(name: str) -> None:
+        if directory_fd is not None:
+            os.unlink(name, dir_fd=directory_fd)
+        else:
+            os.remove(os.path.join(directory, name))
+
+    names = set(entries_by_name)
+    ready = []
+
+    try:
+        for operation in operations:
+            entry = entries_by_name.get(operation["source"])
+            if entry is None or entry.is_symlink():
+                results["skipped"] += 1
+                continue
+
+            if verify_sources:
+                file_stat = entry.stat(follow_symlinks=False)
+                if file_stat.st_size != operation["size"] or file_stat.st_mtime_ns != operation["mtime_ns"]:
+                    tqdm.write(f"Skipping {entry.path} (changed since the plan was made)")
+                    results["skipped"] += 1
+                    continue
+
+            ready.append(dict(operation))
+
+        for operation in drop_infeasible_operations(ready, names):
+            tqdm.write(f"Skipping {os.path.join(directory, operation['source'])} ({operation['target']} is "
+                       f"{'already taken' if operation['action'] == 'rename' else 'missing'})")
+            results["skipped"] += 1
+        ready = [operation for operation in ready if not operation.get("infeasible")]
+
+        def move_aside(operation: dict) -> None:
+            """Moves a file to a temporary name so another file can take its name."""
+            temporary_name = f".{operation['source']}.{os.getpid()}.renaming"
+            rename(operation["source"], temporary_name)
+            names.discard(operation["source"])
+            names.add(temporary_name)
+            operation["original"] = operation["source"]
+            operation["source"] = temporary_name
+
+        def skip(operation: dict, reason: str) -> None:
+            tqdm.write(f"Skipping {os.path.join(directory, operation['source'])} ({operation['target']} is {reason})")
+            results["skipped"] += 1
+
+        # Renames run once their target is free, so a failed rename leaves the files waiting on it untouched.
+        # Only cycles (a -> b -> a) and names held by duplicates awaiting deletion need a temporary name.
+        waiting = {operation["source"]: operation for operation in ready}  # Names still held by a pending operation
+        renames = [operation for operation in ready if operation["action"] == "rename"]
+        while renames:
+            blocked = []
+            for operation in renames:
+                if operation["target"] in names:
+                    blocked.append(operation)
+                    continue
+
+                source, target = operation["source"], operation["target"]
+                waiting.pop(operation.get("original", source), None)
+                try:
+                    rename(source, target)
+                    names.discard(source)
+                    names.add(target)
+                    results["renamed"] += 1
+                except OSError as e:
+                    tqdm.write(f"Error processing {os.path.join(directory, source)}: {e}")
+                    results["skipped"] += 1
+
+            if len(blocked) == len(renames):
+                holder = next((waiting[operation["target"]] for operation in blocked
+                               if operation["target"] in waiting and "original" not in waiting[operation["target"]]), None)
+                if holder is None:
+                    for operation in blocked:
+                        skip(operation, "already taken")
+                    break
+                try:
+                    move_aside(holder)
+                except OSError as e:
+                    tqdm.write(f"Error processing {os.path.join(directory, holder['source'])}: {e}")
+                    waiting.pop(holder["source"])  # Its name stays taken; whoever waits on it is skipped
+            renames = blocked
+
+        for operation in ready:
+            if operation["action"] != "delete":
+                continue
+
+            try:
+                if operation["target"] in names:
+                    delete(operation["source"])
+                    names.discard(operation["source"])
+                    results["deleted"] += 1
+                else:
+                    skip(operation, "missing")
+            except OSError as e:
+                tqdm.write(f"Error processing {os.path.join(directory, operation['source'])}: {e}")
+                results["skipped"] += 1
+
+        # Move files whose operation did not happen back from their temporary names
+        for operation in ready:
+            if "original" not in operation or operation["source"] not in names:
+                continue
+            temporary_name, original = operation["source"], operation["original"]
+            try:
+                if original in names:
+                    raise FileExistsError(f"{original} is now taken")
+                rename(temporary_name, original)
+                names.discard(temporary_name)
+                names.add(original)
+            except OSError as e:
+                tqdm.write(f"Could not restore {os.path.join(directory, original)}: {e}")
+
+        left_behind = sorted(name for name in names if name.endswith(f".{os.getpid()}.renaming"))
+        if left_behind:
+            tqdm.write(f"Warning: temporary files left in {directory}: {', '.join(left_behind)}")
+    finally:
+        if directory_fd is not None:
+            os.close(directory_fd)
+
+def apply_rename_plan(operations: Iterable[dict], verify_sources: bool = False) -> dict[str, int]:
+    """
+    Apply phase: performs plan operations in bulk, one directory at a time.
+
+    :param operations: Operation records, grouped by directory.
+    :param verify_sources: Skip files whose size or mtime changed since planning (for saved plans).
+    :return: Counts of "renamed", "deleted" and "skipped" files.
+    """
+    results = {"renamed": 0, "deleted": 0, "skipped": 0}
+    current_directory = None
+    batch = []
+
+    for operation in tqdm(operations, desc="Applying Plan", unit="file"):
+        if operation["directory"] != current_directory and batch:
+            apply_directory_plan(current_directory, batch, results, verify_sources)
+            batch = []
+        current_directory = operation["directory"]
+        batch.append(operation)
 
-def process_files_in_directory(directory_path: str, digest_length: int = 12) -> None:
+    if batch:
+        apply_directory_plan(current_directory, batch, results, verify_sources)
+
+    return results
+
+def process_files_in_directory(directory_path: str, digest_length: int = 12, checksum_index: ChecksumIndex | None = None,
+                               schedule_devices: bool = True, device_workers: dict[str, int] | None = None,
+                               hash_options: HashOptions = DEFAULT_HASH_OPTIONS, dry_run: bool = False,
+                               plan_path: str | None = None) -> None:
     """
-    Processes all files in the specified directory by renaming them using their SHAKE-128 checksum.
+    Processes all files in the specified directory by renaming them using their checksum.
 
-    - Utilizes a ThreadPoolExecutor for concurrent execution.
+    - Plans every rename and duplicate deletion first, then applies them per directory.
+    - Streams files from the directory walk straight to the hashing workers.
     - Skips directories, only processing regular files.
+    - Reuses checksums from the checksum index for unchanged files.
+    - Schedules reads per device unless schedule_devices is False.
 
     :param directory_path: Path to the target folder containing files to process.
-    :param digest_length: Number of bytes for the SHAKE-128 digest (default: 12).
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param checksum_index: Optional persistent index of previously computed checksums.
+    :param schedule_devices: Group reads by device instead of using one shared pool.
+    :param device_workers: Worker threads per storage type (defaults to DEVICE_WORKERS).
+    :param hash_options: Digest engine, buffer size and read mode.
+    :param dry_run: Only plan; do not rename or delete anything.
+    :param plan_path: Optional JSONL file to write the plan to.
+    """
+    operations, file_count = plan_checksum_renames(directory_path, digest_length, checksum_index,
+                                                   schedule_devices, device_workers, hash_options)
+
+    if not file_count:
+        print("No files found in the specified directory.")
+        return
+
+    if checksum_index is not None:
+        print(f"Checksums reused from index: {checksum_index.reused}, computed: {checksum_index.computed}")
+
+    renames = sum(1 for operation in operations if operation["action"] == "rename")
+    print(f"Planned: {renames} renames, {len(operations) - renames} duplicate deletions, "
+          f"{file_count - len(operations)} files unchanged")
+
+    if plan_path:
+        write_rename_plan(operations, plan_path)
+        print(f"Plan saved to: {plan_path}")
+
+    if dry_run or not operations:
+        return
+
+    results = apply_rename_plan(operations)
+    print(f"Renamed: {results['renamed']}, duplicates removed: {results['deleted']}, skipped: {results['skipped']}")
+
+def calculate_partial_checksum(file_path: str, digest_length: int = 12,
+                               hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> str:
+    """
+    Computes a checksum over the first and last PARTIAL_HASH_EDGE bytes of a file.
+
+    - Files no larger than two edges are hashed in full, so their partial checksum is exact.
+
+    :param file_path: Absolute path of the file to compute checksum for.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param hash_options: Digest engine (buffer size and read mode are not used).
+    :return: Hexadecimal checksum string.
+    """
+    engine = HASH_ENGINES[hash_options.engine]
+    hasher = engine.new(digest_length)
+
+    with open(file_path, 'rb', buffering=0) as file:
+        file_size = os.fstat(file.fileno()).st_size
+        if file_size <= 2 * PARTIAL_HASH_EDGE:
+            hasher.update(file.read())
+        else:
+            hasher.update(file.read(PARTIAL_HASH_EDGE))
+            file.seek(-PARTIAL_HASH_EDGE, os.SEEK_END)
+            hasher.update(file.read(PARTIAL_HASH_EDGE))
+
+    return engine.finish(hasher, digest_length)
+
+def group_files_by_checksum(file_groups: list[list[str]], checksum_worker: Callable[[str], str], description: str,
+                            schedule_devices: bool = True, device_workers: dict[str, int] | None = None) -> list[list[str]]:
     """
-    file_list = []
+    Hashes candidate files and splits each group into sub-groups of identical checksums.
 
-    # Collect all files in the directory
-    for root, _, files in os.walk(directory_path):
-        for filename in files:
-            file_list.append(os.path.join(root, filename))
+    :param file_groups: Groups of files that may be identical.
+    :param checksum_worker: Function returning a file's checksum.
+    :param description: Progress bar label.
+    :param schedule_devices: Group reads by device instead of using one shared pool.
+    :param device_workers: Worker threads per storage type (defaults to DEVICE_WORKERS).
+    :return: Groups of two or more files whose checksums match.
+    """
+    group_of_file = {file_path: group_number for group_number, group in enumerate(file_groups) for file_path in group}
+    buckets = defaultdict(list)
+
+    def record_checksum(file_path: str, checksum: str) -> None:
+        buckets[(group_of_file[file_path], checksum)].append(file_path)
+
+    run_file_pipeline((file_path for group in file_groups for file_path in group), checksum_worker, description,
+                      on_result=record_checksum, schedule_devices=schedule_devices, device_workers=device_workers)
+
+    return [sorted(bucket) for bucket in buckets.values() if len(bucket) > 1]
+
+def find_duplicate_files(root_directories: list[str], digest_length: int = 12,
+                         checksum_index: ChecksumIndex | None = None, schedule_devices: bool = True,
+                         device_workers: dict[str, int] | None = None,
+                         hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> tuple[list[tuple[int, list[str]]], dict[str, int]]:
+    """
+    Finds duplicate files across several roots, reading as little data as possible.
+
+    - Stage 1 groups files by size and drops unique sizes (and empty files) without reading anything.
+    - Stage 2 hashes the first and last 64 KB of each remaining file.
+    - Stage 3 fully hashes only files whose partial checksums collide.
+    - Paths that are already hardlinks of each other count as one file.
+
+    :param root_directories: Folders to search.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param checksum_index: Optional persistent index used for full checksums.
+    :param schedule_devices: Group reads by device instead of using one shared pool.
+    :param device_workers: Worker threads per storage type (defaults to DEVICE_WORKERS).
+    :param hash_options: Digest engine, buffer size and read mode.
+    :return: Tuple of (duplicate sets as (file size, paths) sorted by path, statistics). The size comes from
+             the scan, so files removed while hashing do not need to be stat'ed again.
+    """
+    files_by_size = defaultdict(dict)
+    stats = {"files": 0, "bytes": 0, "partially_hashed": 0, "fully_hashed": 0}
+
+    for root_directory in root_directories:
+        for entry in tqdm(iter_file_entries(root_directory, checksum_index), desc=f"Scanning {root_directory}", unit="file"):
+            try:
+                if entry.is_symlink():
+                    continue
+                file_stat = entry.stat(follow_symlinks=False)
+            except OSError as e:
+                tqdm.write(f"Error processing {entry.path}: {e}")
+                continue
+
+            # Overlapping roots and existing hardlinks share an inode
+            files_by_inode = files_by_size[file_stat.st_size]
+            if (file_stat.st_dev, file_stat.st_ino) not in files_by_inode:
+                files_by_inode[(file_stat.st_dev, file_stat.st_ino)] = entry.path
+                stats["files"] += 1
+                stats["bytes"] += file_stat.st_size
 
-    if not file_list:
+    size_groups = [sorted(files_by_inode.values()) for size, files_by_inode in files_by_size.items()
+                   if size > 0 and len(files_by_inode) > 1]
+    candidate_sizes = {file_path: size for size, files_by_inode in files_by_size.items()
+                       if size > 0 and len(files_by_inode) > 1 for file_path in files_by_inode.values()}
+    small_files = {file_path for file_path, size in candidate_sizes.items() if size <= 2 * PARTIAL_HASH_EDGE}
+    del files_by_size
+
+    stats["partially_hashed"] = sum(len(group) for group in size_groups)
+    partial_worker = partial(calculate_partial_checksum, digest_length=digest_length, hash_options=hash_options)
+    partial_groups = group_files_by_checksum(size_groups, partial_worker, "Partial Hashing",
+                                             schedule_devices, device_workers)
+
+    # Small files were hashed in full by the prefilter
+    duplicate_sets = [group for group in partial_groups if group[0] in small_files]
+    full_groups = [group for group in partial_groups if group[0] not in small_files]
+
+    stats["fully_hashed"] = sum(len(group) for group in full_groups)
+    full_worker = partial(get_file_checksum, digest_length=digest_length, checksum_index=checksum_index,
+                          hash_options=hash_options)
+    duplicate_sets.extend(group_files_by_checksum(full_groups, full_worker, "Full Hashing",
+                                                  schedule_devices, device_workers))
+
+    return [(candidate_sizes[duplicate_set[0]], duplicate_set) for duplicate_set in sorted(duplicate_sets)], stats
+
+def link_duplicate_file(original_path: str, duplicate_path: str, link_mode: str) -> None:
+    """
+    Replaces a duplicate file with a hardlink or reflink to the original.
+
+    - The link is created under a temporary name and then atomically moved over the duplicate.
+    - Reflinks keep the duplicate's own permissions and timestamps.
+
+    :param original_path: File to keep.
+    :param duplicate_path: Identical file to replace.
+    :param link_mode: "hardlink" or "reflink".
+    """
+    temporary_path = os.path.join(os.path.dirname(duplicate_path),
+                                  f".{os.path.basename(duplicate_path)}.{os.getpid()}.linking")
+
+    try:
+        if link_mode == "hardlink":
+            os.link(original_path, temporary_path)
+        else:
+            if fcntl is None:
+                raise OSError("reflinks are not supported on this platform")
+            with open(original_path, "rb") as source, open(temporary_path, "wb") as target:
+                fcntl.ioctl(target.fileno(), FICLONE, source.fileno())
+            shutil.copystat(duplicate_path, temporary_path)
+
+        os.replace(temporary_path, duplicate_path)
+    except OSError:
+        if os.path.lexists(temporary_path):
+            os.remove(temporary_path)
+        raise
+
+def dedupe_directories(root_directories: list[str], digest_length: int = 12,
+                       checksum_index: ChecksumIndex | None = None, schedule_devices: bool = True,
+                       device_workers: dict[str, int] | None = None, hash_options: HashOptions = DEFAULT_HASH_OPTIONS,
+                       report_path: str | None = None, link_mode: str | None = None) -> None:
+    """
+    Finds duplicates across the given roots and reports them or resolves them with links.
+
+    - Nothing is renamed or deleted; the first path of each set (sorted) is kept as the original.
+
+    :param root_directories: Folders to search.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param checksum_index: Optional persistent index used for full checksums.
+    :param schedule_devices: Group reads by device instead of using one shared pool.
+    :param device_workers: Worker threads per storage type (defaults to DEVICE_WORKERS).
+    :param hash_options: Digest engine, buffer size and read mode.
+    :param report_path: Optional JSONL file receiving one record per duplicate set.
+    :param link_mode: "hardlink" or "reflink" to replace duplicates, or None to only report.
+    """
+    duplicate_sets, stats = find_duplicate_files(root_directories, digest_length, checksum_index,
+                                                 schedule_devices, device_workers, hash_options)
+
+    if not stats["files"]:
+        print("No files found in the specified directories.")
+        return
+
+    duplicate_files = sum(len(duplicate_set) - 1 for _, duplicate_set in duplicate_sets)
+    reclaimable_bytes = sum(size * (len(duplicate_set) - 1) for size, duplicate_set in duplicate_sets)
+
+    print(f"Scanned {stats['files']} files ({stats['bytes'] / (1024 * 1024):.2f} MB): "
+          f"{stats['partially_hashed']} partially hashed, {stats['fully_hashed']} fully hashed")
+    print(f"Found {len(duplicate_sets)} duplicate sets, {duplicate_files} redundant files "
+          f"({reclaimable_bytes / (1024 * 1024):.2f} MB reclaimable)")
+
+    if report_path:
+        with open(report_path, "w", encoding="utf-8") as report_file:
+            for size, duplicate_set in duplicate_sets:
+                record = {"size": size, "original": duplicate_set[0],
+                          "duplicates": duplicate_set[1:]}
+                report_file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        print(f"Duplicate report saved to: {report_path}")
+
+    if link_mode is None:
+        return
+
+    linked = failed = 0
+    for _, duplicate_set in tqdm(duplicate_sets, desc=f"Linking Duplicates ({link_mode})", unit="set"):
+        original_path = duplicate_set[0]
+        for duplicate_path in duplicate_set[1:]:
+            try:
+                link_duplicate_file(original_path, duplicate_path, link_mode)
+                linked += 1
+            except OSError as e:
+                tqdm.write(f"Error linking {duplicate_path}: {e}")
+                failed += 1
+
+    print(f"Linked: {linked}, failed: {failed}")
+
+class InotifyWatcher:
+    """
+    Reports files that were closed after writing or moved into a directory tree (Linux only).
+
+    - Uses the libc inotify API through ctypes; every directory in the tree gets a watch.
+    - Directories created or moved in later are watched too, and files already inside them are reported.
+    """
+
+    def __init__(self, root_directory: str):
+        libc_name = ctypes.util.find_library("c")
+        self._libc = ctypes.CDLL(libc_name or "libc.so.6", use_errno=True)
+        if not hasattr(self._libc, "inotify_init1"):
+            raise OSError("inotify is not available on this platform")
+
+        self._fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self._fd < 0:
+            error_number = ctypes.get_errno()
+            raise OSError(error_number, os.strerror(error_number))
+
+        self.root_directory = root_directory
+        self._watches = {}  # Watch descriptor -> directory path
+        self._add_tree(root_directory)
+
+    def _add_tree(self, directory: str) -> list[str]:
+        """Watches a directory and all of its subdirectories, returning the files they already contain."""
+        existing_files = []
+        for root, _, files in walk(directory):
+            watch_descriptor = self._libc.inotify_add_watch(self._fd, os.fsencode(root), INOTIFY_WATCH_MASK)
+            if watch_descriptor < 0:
+                error_number = ctypes.get_errno()
+                tqdm.write(f"Error watching {root}: {os.strerror(error_number)}")
+                continue
+
+            self._watches[watch_descriptor] = root
+            existing_files.extend(entry.path for entry in files)
+        return existing_files
+
+    def read_events(self, timeout: float) -> list[str]:
+        """
+        Waits up to timeout seconds and returns the paths of files that landed.
+
+        - After an event queue overflow, every file in the tree is reported again.
+        """
+        ready, _, _ = select.select([self._fd], [], [], timeout)
+        if not ready:
+            return []
+
+        data = os.read(self._fd, 64 * 1024)
+        file_paths = []
+        offset = 0
+
+        while offset < len(data):
+            watch_descriptor, mask, _, name_length = INOTIFY_EVENT_HEADER.unpack_from(data, offset)
+            offset += INOTIFY_EVENT_HEADER.size
+            name = os.fsdecode(data[offset:offset + name_length].rstrip(b"\0"))
+            offset += name_length
+
+            if mask & IN_Q_OVERFLOW:
+                tqdm.write("Warning: inotify event queue overflowed, rescanning the tree.")
+                file_paths.extend(iter_files(self.root_directory))
+                continue
+
+            directory = self._watches.get(watch_descriptor)
+            if directory is None:
+                continue
+
+            if mask & IN_IGNORED:
+                del self._watches[watch_descriptor]  # Directory was removed
+            elif mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    file_paths.extend(self._add_tree(os.path.join(directory, name)))
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                file_paths.append(os.path.join(directory, name))
+
+        return file_paths
+
+    def close(self) -> None:
+        """Releases the inotify instance and all of its watches."""
+        os.close(self._fd)
+
+class PollingWatcher:
+    """
+    Reports new or modified files by rescanning the tree periodically (fallback for non-Linux systems).
+
+    - Files present when the watcher starts are not reported.
+    """
+
+    def __init__(self, root_directory: str, poll_interval: float = 5.0):
+        self.root_directory = root_directory
+        self.poll_interval = poll_interval
+        self._snapshot = self._scan()
+        self._next_poll = time.monotonic() + poll_interval
+
+    def _scan(self) -> dict[str, tuple[int, int]]:
+        """Returns the size and mtime_ns of every file in the tree."""
+        snapshot = {}
+        for entry in iter_file_entries(self.root_directory):
+            try:
+                file_stat = entry.stat()
+            except OSError:
+                continue
+            snapshot[entry.path] = (file_stat.st_size, file_stat.st_mtime_ns)
+        return snapshot
+
+    def read_events(self, timeout: float) -> list[str]:
+        """Waits up to timeout seconds and returns files that appeared or changed since the last scan."""
+        wait_time = self._next_poll - time.monotonic()
+        if wait_time > timeout:
+            time.sleep(timeout)
+            return []
+
+        time.sleep(max(0.0, wait_time))
+        self._next_poll = time.monotonic() + self.poll_interval
+
+        snapshot = self._scan()
+        changed_files = [file_path for file_path, signature in snapshot.items()
+                         if self._snapshot.get(file_path) != signature]
+        self._snapshot = snapshot
+        return changed_files
+
+    def close(self) -> None:
+        """Nothing to release for the polling watcher."""
+
+def watch_directory(directory_path: str, digest_length: int = 12, checksum_index: ChecksumIndex | None = None,
+                    hash_options: HashOptions = DEFAULT_HASH_OPTIONS, debounce: float = 2.0,
+                    poll_interval: float = 5.0, force_polling: bool = False) -> None:
+    """
+    Renames files as they land in the directory tree until interrupted with Ctrl+C.
+
+    - Uses inotify where available and falls back to periodic rescans.
+    - A file is processed once it has had no events and kept the same size and mtime for `debounce` seconds.
+    - Files are processed one at a time, so identical files cannot race each other.
+
+    :param directory_path: Path to the folder to watch.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param checksum_index: Optional persistent index of previously computed checksums.
+    :param hash_options: Digest engine, buffer size and read mode.
+    :param debounce: Seconds a file must stay unchanged before it is renamed.
+    :param poll_interval: Seconds between rescans when polling.
+    :param force_polling: Use the polling watcher even if inotify is available.
+    """
+    watcher = None
+    if not force_polling:
+        try:
+            watcher = InotifyWatcher(directory_path)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), falling back to polling every {poll_interval:g} seconds.")
+    if watcher is None:
+        watcher = PollingWatcher(directory_path, poll_interval)
+
+    pending = {}  # Path -> (time of last event, size, mtime_ns)
+    produced_paths = set()  # Our own renames, whose moved-to events must be ignored
+    processed = 0
+
+    print(f"Watching {directory_path} ({type(watcher).__name__}). Press Ctrl+C to stop.")
+
+    try:
+        while True:
+            now = time.monotonic()
+            timeout = min((last_event + debounce - now for last_event, _, _ in pending.values()), default=1.0)
+            for file_path in watcher.read_events(max(0.05, timeout)):
+                filename = os.path.basename(file_path)
+                if file_path in produced_paths:
+                    produced_paths.discard(file_path)
+                    continue
+                if filename.startswith(".") and filename.endswith(TEMPORARY_SUFFIXES):
+                    continue
+                if checksum_index is not None and checksum_index.owns_path(file_path):
+                    continue
+                try:
+                    file_stat = os.lstat(file_path)
+                except OSError:
+                    continue
+                if stat.S_ISLNK(file_stat.st_mode):
+                    continue  # Symlinks are never renamed (same as a full run)
+                pending[file_path] = (time.monotonic(), file_stat.st_size, file_stat.st_mtime_ns)
+
+            now = time.monotonic()
+            for file_path, (last_event, size, mtime_ns) in list(pending.items()):
+                if now - last_event < debounce:
+                    continue
+
+                try:
+                    file_stat = os.lstat(file_path)
+                except OSError:
+                    del pending[file_path]  # Removed or renamed by someone else
+                    continue
+                if stat.S_ISLNK(file_stat.st_mode):
+                    del pending[file_path]  # Replaced by a symlink since the event
+                    continue
+
+                # Still being written: wait for another quiet period
+                if (file_stat.st_size, file_stat.st_mtime_ns) != (size, mtime_ns):
+                    pending[file_path] = (now, file_stat.st_size, file_stat.st_mtime_ns)
+                    continue
+
+                del pending[file_path]
+                try:
+                    new_file_path = rename_file_to_checksum(file_path, digest_length, checksum_index, hash_options)
+                except OSError as e:
+                    tqdm.write(f"Error processing {file_path}: {e}")
+                    continue
+
+                processed += 1
+                if new_file_path is None:
+                    tqdm.write(f"Removed duplicate: {file_path}")
+                elif new_file_path != file_path:
+                    produced_paths.add(new_file_path)
+                    tqdm.write(f"Renamed: {file_path} -> {os.path.basename(new_file_path)}")
+
+            if checksum_index is not None and not pending:
+                checksum_index.flush()
+    except KeyboardInterrupt:
+        print(f"\nStopped watching. Files processed: {processed}")
+    finally:
+        watcher.close()
+
+def verify_checksum_index(directory_path: str, checksum_index: ChecksumIndex, digest_length: int = 12,
+                          schedule_devices: bool = True, device_workers: dict[str, int] | None = None,
+                          hash_options: HashOptions = DEFAULT_HASH_OPTIONS) -> None:
+    """
+    Re-hashes every file in the directory and reports index entries that no longer match.
+
+    - Does not rename files or modify the index.
+
+    :param directory_path: Path to the target folder containing files to verify.
+    :param checksum_index: Persistent index of previously computed checksums.
+    :param digest_length: Number of bytes for the digest (default: 12).
+    :param schedule_devices: Group reads by device instead of using one shared pool.
+    :param device_workers: Worker threads per storage type (defaults to DEVICE_WORKERS).
+    :param hash_options: Digest engine, buffer size and read mode.
+    """
+    results = {"valid": 0, "stale": 0, "missing": 0, "mismatch": 0}
+
+    def record_status(file_path: str, status: str) -> None:
+        results[status] += 1
+        if status == "mismatch":
+            tqdm.write(f"Checksum mismatch: {file_path}")
+
+    verify_worker = partial(checksum_index.verify, digest_length=digest_length, hash_options=hash_options)
+    file_count = run_file_pipeline(iter_file_entries(directory_path, checksum_index), verify_worker,
+                                   "Verifying Index", on_result=record_status,
+                                   schedule_devices=schedule_devices, device_workers=device_workers)
+
+    if not file_count:
         print("No files found in the specified directory.")
         return
 
-    # Use tqdm progress bar while processing files
-    with ThreadPoolExecutor() as executor:
-        list(tqdm(executor.map(rename_file_to_checksum, file_list, [digest_length] * len(file_list)), 
-                  total=len(file_list), desc="Renaming Files", unit="file"))
+    print(f"Valid: {results['valid']}, stale: {results['stale']}, "
+          f"missing: {results['missing']}, mismatched: {results['mismatch']}")
 
 def main() -> None:
     """
     Main function.
 
-    - Accepts a directory path as a command-line argument.
-    - Prompts for filename checksum length (default: 12).
-    - Processes each file within the directory to rename them based on SHAKE-128 checksum.
+    - Accepts a directory path as a command-line argument (several for --dedupe-only).
+    - Prompts for filename checksum length (default: 12) unless --length is given.
+    - Runs the I/O or hash engine benchmark instead of renaming if requested.
+    - Applies a saved plan instead of hashing if --apply-plan is given.
+    - Opens the checksum index if --index is given, optionally verifying, rebuilding or pruning it.
+    - Watches the directory and renames files as they land if --watch is given.
+    - Finds duplicates across all directories instead of renaming if --dedupe-only is given.
+    - Processes each file within the directory to rename them based on their checksum.
     """
-    if len(sys.argv) < 2:
-        print("Usage: python checksum-rename.py <directory_path>")
+    parser = argparse.ArgumentParser(description="Rename files using their SHAKE-128 (or other) checksum.")
+    parser.add_argument("directories", nargs="+", metavar="directory",
+                        help="Directory containing files to rename (several with --dedupe-only).")
+    parser.add_argument("--length", type=int, help="Checksum filename length in bytes (prompted if omitted).")
+    parser.add_argument("--index", help="SQLite file used to cache checksums between runs.")
+    parser.add_argument("--verify-index", action="store_true", help="Re-hash all files and report stale or mismatched index entries.")
+    parser.add_argument("--rebuild-index", action="store_true", help="Discard the index and hash every file again.")
+    parser.add_argument("--prune-index", action="store_true", help="After the run, remove index entries for files that were not seen (deleted or replaced).")
+    parser.add_argument("--ssd-workers", type=int, default=DEVICE_WORKERS["ssd"], help="Concurrent reads per SSD.")
+    parser.add_argument("--hdd-workers", type=int, default=DEVICE_WORKERS["hdd"], help="Concurrent reads per spinning or removable disk.")
+    parser.add_argument("--no-device-scheduling", action="store_true", help="Use one shared worker pool instead of per-device pools.")
+    parser.add_argument("--benchmark-io", action="store_true", help="Compare naive and device-aware hashing throughput without renaming.")
+    parser.add_argument("--algorithm", choices=sorted(HASH_ENGINES), default="shake_128", help="Digest engine (default: shake_128).")
+    parser.add_argument("--buffer-size", type=int, default=DEFAULT_BUFFER_SIZE // 1024, help="Read buffer size in KB (default: 128).")
+    parser.add_argument("--read-mode", choices=READ_MODES, default="readinto", help="How file contents are read (default: readinto).")
+    parser.add_argument("--benchmark", action="store_true", help="Measure every engine, buffer size and read mode on a sample and recommend the fastest.")
+    parser.add_argument("--dry-run", action="store_true", help="Plan renames and duplicate deletions without applying them.")
+    parser.add_argument("--plan-file", help="Write the rename plan to this JSONL file.")
+    parser.add_argument("--apply-plan", metavar="PLAN_FILE", help="Apply a previously saved JSONL plan instead of hashing.")
+    parser.add_argument("--dedupe-only", action="store_true", help="Find duplicates across all directories without renaming.")
+    parser.add_argument("--dedupe-report", metavar="REPORT_FILE", help="Write duplicate sets to this JSONL file (with --dedupe-only).")
+    parser.add_argument("--watch", action="store_true", help="Keep running and rename files as they land in the directory.")
+    parser.add_argument("--debounce", type=float, default=2.0, help="Seconds a file must be unchanged before it is renamed (default: 2).")
+    parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds between rescans when inotify is unavailable (default: 5).")
+    parser.add_argument("--force-polling", action="store_true", help="Rescan periodically even if inotify is available.")
+    parser.add_argument("--link", choices=LINK_MODES, help="Replace duplicates with hardlinks or reflinks (with --dedupe-only).")
+
+    args = parser.parse_args()
+    target_directory = args.directories[0]
+
+    for directory in args.directories:
+        if not os.path.isdir(directory):
+            print(f"Error: '{directory}' is not a valid directory.")
+            sys.exit(1)
+
+    if len(args.directories) > 1 and not args.dedupe_only:
+        print("Error: Multiple directories are only supported with --dedupe-only.")
         sys.exit(1)
 
-    target_directory = sys.argv[1]
+    if (args.dedupe_report or args.link) and not args.dedupe_only:
+        print("Error: --dedupe-report and --link require --dedupe-only.")
+        sys.exit(1)
+
+    if (args.verify_index or args.rebuild_index or args.prune_index) and not args.index:
+        print("Error: --verify-index, --rebuild-index and --prune-index require --index.")
+        sys.exit(1)
 
-    if not os.path.isdir(target_directory):
-        print(f"Error: '{target_directory}' is not a valid directory.")
+    if args.prune_index and (args.watch or args.dedupe_only or args.apply_plan):
+        print("Error: --prune-index needs a full run over the directory (not --watch, --dedupe-only or --apply-plan).")
         sys.exit(1)
-    
-    # Prompt user for checksum length with default value of 12
+
+    if args.apply_plan:
+        if not os.path.isfile(args.apply_plan):
+            print(f"Error: Plan file '{args.apply_plan}' not found.")
+            sys.exit(1)
+
+        results = apply_rename_plan(read_rename_plan(args.apply_plan), verify_sources=True)
+        print(f"Renamed: {results['renamed']}, duplicates removed: {results['deleted']}, skipped: {results['skipped']}")
+        return
+
+    digest_length = args.length
+    if digest_length is None and args.dedupe_only:
+        digest_length = 16  # Not used for names, so no need to ask
+    elif digest_length is None:
+        # Prompt user for checksum length with default value of 12
+        try:
+            digest_length = int(input("Enter checksum filename length (default: 12): ") or 12)
+        except ValueError:
+            print("Invalid input. Using default length of 12.")
+            digest_length = 12
+
+    max_digest_length = HASH_ENGINES[args.algorithm].max_digest_length
+    if digest_length < 1 or (max_digest_length and digest_length > max_digest_length):
+        print(f"Error: {args.algorithm} supports checksum lengths of 1 to {max_digest_length or 'any'} bytes.")
+        sys.exit(1)
+
+    hash_options = HashOptions(args.algorithm, max(1, args.buffer_size) * 1024, args.read_mode)
+    device_workers = {"ssd": max(1, args.ssd_workers), "hdd": max(1, args.hdd_workers)}
+    schedule_devices = not args.no_device_scheduling
+
+    if args.benchmark:
+        benchmark_hash_engines(target_directory, digest_length)
+        return
+
+    if args.benchmark_io:
+        benchmark_io_strategies(target_directory, digest_length, device_workers, hash_options)
+        return
+
+    checksum_index = ChecksumIndex(args.index) if args.index else None
+
     try:
-        digest_length = int(input("Enter checksum filename length (default: 12): ") or 12)
-    except ValueError:
-        print("Invalid input. Using default length of 12.")
-        digest_length = 12
-    
-    process_files_in_directory(target_directory, digest_length)
+        if args.rebuild_index and not args.verify_index:
+            checksum_index.clear()
+
+        if args.verify_index:
+            verify_checksum_index(target_directory, checksum_index, digest_length, schedule_devices, device_workers,
+                                  hash_options)
+        elif args.watch:
+            watch_directory(target_directory, digest_length, checksum_index, hash_options,
+                            args.debounce, args.poll_interval, args.force_polling)
+        elif args.dedupe_only:
+            dedupe_directories(args.directories, digest_length, checksum_index, schedule_devices, device_workers,
+                               hash_options, args.dedupe_report, args.link)
+        else:
+            process_files_in_directory(target_directory, digest_length, checksum_index, schedule_devices,
+                                       device_workers, hash_options, args.dry_run, args.plan_file)
+
+        if args.prune_index:
+            print(f"Index entries removed for files no longer present: {checksum_index.prune()}")
+    finally:
+        if checksum_index is not None:
+            checksum_index.close()
 
 if __name__ == '__main__':
     main()
\ No newline at end of file
@@ -0,0 +1,73 @@
+"""
+Watch mode tests for checksum-rename.py.
+
+Runs the script with --watch in a subprocess, drops files into the watched folder
+and stops it with Ctrl+C (SIGINT), then checks what is left on disk.
+
+Usage:
+    python -m unittest discover -s Filesystem_Tools/Renamers/checksum-file-renamer/tests
+"""
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+SCRIPT_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "checksum-rename.py")
+SETTLE_SECONDS = 1.5  # Long enough for the debounce (0.2 s) and a few polls (0.2 s)
+
+@unittest.skipUnless(hasattr(os, "symlink") and hasattr(signal, "SIGINT") and os.name == "posix",
+                     "needs symlinks and SIGINT")
+class WatchModeSymlinkTest(unittest.TestCase):
+    def run_watch(self, directory, *steps, options=()):
+        """Starts --watch on directory, runs each step once the previous one has settled, then stops it."""
+        process = subprocess.Popen([sys.executable, SCRIPT_PATH, directory, "--length", "4", "--watch",
+                                    "--debounce", "0.2", "--poll-interval", "0.2", *options],
+                                   stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True)
+        try:
+            time.sleep(1.0)  # Let the watcher take its initial snapshot or add its watches
+            for step in steps:
+                step()
+                time.sleep(SETTLE_SECONDS)
+        finally:
+            process.send_signal(signal.SIGINT)
+            output, _ = process.communicate(timeout=10)
+        return output
+
+    def check_symlink_is_left_alone(self, *options):
+        with tempfile.TemporaryDirectory() as staging, tempfile.TemporaryDirectory() as watched:
+            real_path = os.path.join(watched, "real.bin")
+            with open(real_path, "wb") as real_file:
+                real_file.write(b"payload")  # Present before the watch starts, so not reported yet
+
+            def drop_link():
+                os.symlink("real.bin", os.path.join(staging, "alink.bin"))
+                os.rename(os.path.join(staging, "alink.bin"), os.path.join(watched, "alink.bin"))  # Moved in
+
+            def rewrite_target():
+                time.sleep(0.05)  # Make sure the modification time changes for the polling watcher
+                with open(real_path, "wb") as real_file:
+                    real_file.write(b"payload")
+
+            output = self.run_watch(watched, drop_link, rewrite_target, options=options)
+
+            names = sorted(os.listdir(watched))
+            links = [name for name in names if os.path.islink(os.path.join(watched, name))]
+            files = [name for name in names if not os.path.islink(os.path.join(watched, name))]
+
+            self.assertEqual(links, ["alink.bin"], output)  # The link kept its name
+            self.assertEqual(len(files), 1, output)  # The real file was renamed, not deleted
+            self.assertNotEqual(files[0], "real.bin", output)
+            with open(os.path.join(watched, files[0]), "rb") as renamed_file:
+                self.assertEqual(renamed_file.read(), b"payload")
+
+    def test_symlink_with_default_watcher(self):
+        self.check_symlink_is_left_alone()
+
+    def test_symlink_with_polling_watcher(self):
+        self.check_symlink_is_left_alone("--force-polling")
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,269 @@
+"""
+Filesystem Walker
+-----------------------------
+Author: yung-megafone
+Date: 2026-10-18
+License: MIT License
+
+Description:
+Shared directory walker used by the Filesystem Tools scripts.
+It is built on `os.scandir`, so each directory is listed once and the entry
+type (and, on Windows, the stat result) comes from the `DirEntry` cache instead
+of separate `isdir`/`isfile`/`getsize` calls.
+
+Features:
+- Streaming generators: entries are yielded while the tree is being walked.
+- Iterative traversal (no recursion limit on deep trees).
+- Prunes excluded names and hidden entries before descending into them.
+- Optional gitignore-style rules (`ExcludeRules`): globs, `**`, anchored
+  patterns, directory-only patterns, `!` negation and include patterns.
+- Filters files by extension (case-insensitive) during traversal.
+- Does not descend into symlinked directories (same as `os.walk`).
+
+Usage:
+    import sys, os
+    sys.path.insert(0, "/path/to/Filesystem_Tools")
+    from fswalk import walk_files
+
+    for entry in walk_files("/path/to/music", extensions=(".mp3", ".flac")):
+        print(entry.path, entry.stat().st_size)
+
+    rules = ExcludeRules(["node_modules/", "*.tmp", "/build/**", "!build/keep.txt"])
+    folders, files = list_directory("/path/to/project", rules=rules)
+"""
+import os
+import re
+from collections.abc import Callable, Iterable, Iterator
+
+def _glob_to_regex(pattern: str) -> str:
+    """Translates a gitignore glob (without "!", leading or trailing "/") to a regex for a "/"-separated path."""
+    regex, index = [], 0
+    while index < len(pattern):
+        char = pattern[index]
+        if pattern.startswith("**", index) and (index == 0 or pattern[index - 1] == "/"):
+            if pattern.startswith("**/", index):
+                regex.append("(?:.*/)?")  # Zero or more folders
+                index += 3
+                continue
+            if index + 2 == len(pattern):
+                regex.append(".*")  # Everything inside
+                index += 2
+                continue
+        if char == "*":
+            while pattern.startswith("*", index + 1):
+                index += 1
+            regex.append("[^/]*")
+        elif char == "?":
+            regex.append("[^/]")
+        elif char == "[" and "]" in pattern[index + 2:]:
+            end = pattern.index("]", index + 2)
+            members = pattern[index + 1:end]
+            if members.startswith("!"):
+                members = "^" + members[1:]
+            regex.append("[" + members.replace("\\", "\\\\") + "]")
+            index = end
+        elif char == "\\" and index + 1 < len(pattern):
+            index += 1
+            regex.append(re.escape(pattern[index]))
+        else:
+            regex.append(re.escape(char))
+        index += 1
+    return "".join(regex)
+
+class ExcludeRules:
+    """
+    Compiled gitignore-style exclusion rules, matched against paths relative to the walked root.
+
+    - `name`, `*.tmp`: match the entry name at any depth.
+    - `/build`, `docs/*.md`: a "/" anchors the pattern to the root.
+    - `cache/`: a trailing "/" only matches folders; `**` matches any number of folders.
+    - `!pattern`: re-includes entries excluded by an earlier rule (the last matching rule wins). As in git,
+      nothing inside an excluded folder can be re-included, because the folder is never entered.
+    - `include`: if given, only files matching one of these patterns are kept (folders are still entered).
+
+    All rules are combined into one regex per entry type (in reverse order, so the first alternative that
+    matches is the last matching rule), so each entry costs a single match however many rules there are.
+    """
+
+    def __init__(self, patterns: Iterable[str] = (), include: Iterable[str] = ()):
+        self.patterns = [pattern for pattern in (line.rstrip() for line in patterns)
+                         if pattern and not pattern.startswith("#")]
+        self.include = [pattern for pattern in include if pattern]
+
+        folder_rules, file_rules = [], []
+        for pattern in self.patterns:
+            regex, negated, folders_only = self._compile(pattern)
+            folder_rules.append((regex, negated))
+            if not folders_only:
+                file_rules.append((regex, negated))
+
+        self._folder_regex, self._folder_negated = self._combine(folder_rules)
+        self._file_regex, self._file_negated = self._combine(file_rules)
+        self._include_regex = self._combine([(self._compile(pattern)[0], False) for pattern in self.include])[0]
+
+    @staticmethod
+    def _compile(pattern: str) -> tuple[str, bool, bool]:
+        """Returns (regex, negated, folders only) for one rule."""
+        negated = pattern.startswith("!")
+        if negated or pattern.startswith("\\!") or pattern.startswith("\\#"):
+            pattern = pattern[1:]
+        folders_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+        anchored = "/" in pattern
+        regex = _glob_to_regex(pattern.lstrip("/"))
+        return (regex if anchored else f"(?:.*/)?{regex}"), negated, folders_only
+
+    @staticmethod
+    def _combine(rules: list[tuple[str, bool]]) -> tuple[re.Pattern | None, list[bool]]:
+        """Joins rules into one alternation, last rule first; returns the regex and each group's negation flag."""
+        if not rules:
+            return None, []
+        rules = rules[::-1]
+        return re.compile("|".join(f"({regex})" for regex, _ in rules), re.DOTALL), [negated for _, negated in rules]
+
+    @classmethod
+    def from_file(cls, rules_path: str, patterns: Iterable[str] = (), include: Iterable[str] = ()) -> "ExcludeRules":
+        """Reads rules from a file (one per line, "#" comments, like .gitignore) after the given patterns."""
+        with open(rules_path, encoding="utf-8") as rules_file:
+            return cls(list(patterns) + rules_file.read().splitlines(), include)
+
+    def __bool__(self) -> bool:
+        return bool(self.patterns or self.include)
+
+    def excluded(self, relative_path: str, is_dir: bool) -> bool:
+        """
+        Checks one entry against the rules.
+
+        :param relative_path: Path relative to the walked root (os.sep or "/" separated).
+        :param is_dir: Whether the entry is a folder.
+        """
+        if os.sep != "/":
+            relative_path = relative_path.replace(os.sep, "/")
+
+        regex, negated = (self._folder_regex, self._folder_negated) if is_dir else (self._file_regex, self._file_negated)
+        match = regex.fullmatch(relative_path) if regex is not None else None
+        if match is not None and not negated[match.lastindex - 1]:
+            return True
+        return not is_dir and self._include_regex is not None and self._include_regex.fullmatch(relative_path) is None
+
+def _normalize_extensions(extensions: Iterable[str] | None) -> tuple[str, ...] | None:
+    """Lower-cases extensions and ensures each one starts with a dot."""
+    if not extensions:
+        return None
+    return tuple(ext.lower() if ext.startswith(".") else f".{ext.lower()}" for ext in extensions)
+
+def list_directory(directory: str, exclude: Iterable[str] | None = None, include_hidden: bool = True,
+                   sort: bool = False, rules: ExcludeRules | None = None,
+                   relative_path: str = "") -> tuple[list[os.DirEntry], list[os.DirEntry]]:
+    """
+    Lists a single directory with one scandir call.
+
+    :param directory: Directory to list.
+    :param exclude: Entry names to leave out.
+    :param include_hidden: Include names starting with ".".
+    :param sort: Sort both lists by name.
+    :param rules: Optional ExcludeRules; matching entries are left out.
+    :param relative_path: Path of the directory relative to the walked root, for anchored rules.
+    :return: Tuple of (subdirectory entries, file entries).
+    """
+    exclude = set(exclude) if exclude else set()
+    rules = rules or None  # Skip matching entirely for empty rules
+    prefix = f"{relative_path}/" if relative_path else ""
+    folders, files = [], []
+
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name in exclude or (not include_hidden and entry.name.startswith(".")):
+                continue
+            try:
+                if entry.is_dir():
+                    if rules is None or not rules.excluded(prefix + entry.name, True):
+                        folders.append(entry)
+                elif entry.is_file():
+                    if rules is None or not rules.excluded(prefix + entry.name, False):
+                        files.append(entry)
+            except OSError:
+                continue  # Entry vanished or is unreadable
+
+    if sort:
+        folders.sort(key=lambda entry: entry.name)
+        files.sort(key=lambda entry: entry.name)
+
+    return folders, files
+
+def walk(root: str, exclude: Iterable[str] | None = None, include_hidden: bool = True, recursive: bool = True,
+         skip_directory: Callable[[os.DirEntry], bool] | None = None,
+         on_error: Callable[[OSError], None] | None = None) -> Iterator[tuple[str, list[os.DirEntry], list[os.DirEntry]]]:
+    """
+    Walks a directory tree top-down, like os.walk but yielding DirEntry objects.
+
+    - Removing entries from the yielded folder list prunes them, as with os.walk.
+
+    :param root: Directory to walk.
+    :param exclude: Entry names (folders or files) to skip; excluded folders are never entered.
+    :param include_hidden: Include names starting with ".".
+    :param recursive: Descend into subdirectories.
+    :param skip_directory: Optional predicate; folders for which it returns True are not entered.
+    :param on_error: Optional callback for directories that cannot be listed (ignored by default).
+    :return: Iterator of (directory path, subdirectory entries, file entries).
+    """
+    exclude = set(exclude) if exclude else set()
+    pending = [root]
+
+    while pending:
+        directory = pending.pop()
+        try:
+            folders, files = list_directory(directory, exclude, include_hidden)
+        except OSError as e:
+            if on_error is not None:
+                on_error(e)
+            continue
+
+        if skip_directory is not None:
+            folders = [entry for entry in folders if not skip_directory(entry)]
+
+        yield directory, folders, files
+
+        if recursive:
+            # Reversed so subdirectories are visited in listing order
+            pending.extend(entry.path for entry in reversed(folders) if not entry.is_symlink())
+
+def walk_files(root: str, extensions: Iterable[str] | None = None, exclude: Iterable[str] | None = None,
+               include_hidden: bool = True, recursive: bool = True,
+               skip_directory: Callable[[os.DirEntry], bool] | None = None,
+               on_error: Callable[[OSError], None] | None = None) -> Iterator[os.DirEntry]:
+    """
+    Streams the file entries of a directory tree.
+
+    :param root: Directory to walk.
+    :param extensions: Only yield files with these extensions (case-insensitive), e.g. (".mp3", ".flac").
+    :param exclude: Entry names (folders or files) to skip; excluded folders are never entered.
+    :param include_hidden: Include names starting with ".".
+    :param recursive: Descend into subdirectories.
+    :param skip_directory: Optional predicate; folders for which it returns True are not entered.
+    :param on_error: Optional callback for directories that cannot be listed (ignored by default).
+    :return: Iterator of file DirEntry objects.
+    """
+    extensions = _normalize_extensions(extensions)
+
+    for _, _, files in walk(root, exclude, include_hidden, recursive, skip_directory, on_error):
+        for entry in files:
+            if extensions is None or entry.name.lower().endswith(extensions):
+                yield entry
+
+def walk_directories(root: str, exclude: Iterable[str] | None = None, include_hidden: bool = True,
+                     recursive: bool = True, skip_directory: Callable[[os.DirEntry], bool] | None = None,
+                     on_error: Callable[[OSError], None] | None = None) -> Iterator[os.DirEntry]:
+    """
+    Streams the subdirectory entries of a directory tree (the root itself is not included).
+
+    :param root: Directory to walk.
+    :param exclude: Folder names to skip; excluded folders are never entered.
+    :param include_hidden: Include names starting with ".".
+    :param recursive: Descend into subdirectories.
+    :param skip_directory: Optional predicate; folders for which it returns True are neither yielded nor entered.
+    :param on_error: Optional callback for directories that cannot be listed (ignored by default).
+    :return: Iterator of directory DirEntry objects.
+    """
+    for _, folders, _ in walk(root, exclude, include_hidden, recursive, skip_directory, on_error):
+        yield from folders
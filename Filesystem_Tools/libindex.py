@@ -0,0 +1,252 @@
+"""
+Music Library Index
+-----------------------------
+Author: yung-megafone
+Date: 2026-10-18
+License: MIT License
+
+Description:
+Shared SQLite index of audio file tags used by music-renamer.py and meta-write.py.
+Each track is keyed by its absolute path and is only trusted while the file's
+size and modification time (ns) are unchanged, so unchanged files are never
+reopened or reparsed.
+
+For every track the index keeps:
+- The tags last read from the file (track number, title, artist; NULL if absent).
+- The tags meta-write.py last wrote to it, so identical rewrites can be skipped.
+
+Usage (from a script):
+    import sys, os
+    sys.path.insert(0, "/path/to/Filesystem_Tools")
+    from libindex import LibraryIndex
+
+    library_index = LibraryIndex("~/.music-library.sqlite")
+    tags = library_index.lookup(path, os.stat(path))  # None if missing or stale
+
+Usage (querying without touching any audio file):
+    python libindex.py ~/.music-library.sqlite --missing tracknumber
+    python libindex.py ~/.music-library.sqlite --missing artist --under "/mnt/music/Rock"
+    python libindex.py ~/.music-library.sqlite --stats
+    python libindex.py ~/.music-library.sqlite --prune
+
+The index is a plain SQLite database, so it can also be queried directly, e.g.:
+    sqlite3 ~/.music-library.sqlite "SELECT path FROM tracks WHERE title IS NULL"
+"""
+import os
+import sqlite3
+import argparse
+import threading
+
+INDEX_SCHEMA_VERSION = 1  # Bump when the table layout changes; older indexes are rebuilt
+INDEX_COMMIT_INTERVAL = 1000  # Entries written between commits
+INDEX_TAGS = ("tracknumber", "title", "artist")  # Tags stored for every track
+
+class LibraryIndex:
+    """
+    Persistent SQLite index of the tags read from and written to audio files.
+
+    - Entries are keyed by absolute path and only trusted while size and mtime_ns are unchanged.
+    - Storing newly read tags forgets the written tags, since the file changed in between.
+    - Safe to share between worker threads.
+    """
+
+    def __init__(self, index_path: str):
+        self.index_path = os.path.abspath(os.path.expanduser(index_path))
+        self.reused = 0  # Lookups answered from the index
+        self.stored = 0  # Entries written to the index
+        self._pending_writes = 0
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.index_path, check_same_thread=False)
+
+        # Recreate the table if it was written by an incompatible version
+        if self._connection.execute("PRAGMA user_version").fetchone()[0] != INDEX_SCHEMA_VERSION:
+            self._connection.execute("DROP TABLE IF EXISTS tracks")
+            self._connection.execute(f"PRAGMA user_version = {INDEX_SCHEMA_VERSION}")
+
+        tag_columns = ", ".join(f"{tag} TEXT, written_{tag} TEXT" for tag in INDEX_TAGS)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS tracks ("
+            f"path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime_ns INTEGER NOT NULL, {tag_columns}, "
+            "written INTEGER NOT NULL DEFAULT 0)"
+        )
+        self._connection.commit()
+
+    def _fetch(self, file_path: str, file_stat: os.stat_result, columns: tuple) -> tuple | None:
+        """Returns the requested columns for a file if its entry is current (caller must hold the lock)."""
+        row = self._connection.execute(
+            f"SELECT size, mtime_ns, written, {', '.join(columns)} FROM tracks WHERE path = ?",
+            (os.path.abspath(file_path),)).fetchone()
+        if row is None or row[0] != file_stat.st_size or row[1] != file_stat.st_mtime_ns:
+            return None
+        return row[2:]
+
+    def _write(self, file_path: str, file_stat: os.stat_result, tags: dict, written: bool) -> None:
+        """Replaces the entry for a file (caller must hold the lock)."""
+        values = []
+        for tag in INDEX_TAGS:
+            values += [tags.get(tag), tags.get(tag) if written else None]
+
+        self._connection.execute(
+            f"INSERT OR REPLACE INTO tracks VALUES (?, ?, ?, {', '.join('?' * len(values))}, ?)",
+            (os.path.abspath(file_path), file_stat.st_size, file_stat.st_mtime_ns, *values, int(written)))
+        self.stored += 1
+        self._pending_writes += 1
+        if self._pending_writes >= INDEX_COMMIT_INTERVAL:
+            self._connection.commit()
+            self._pending_writes = 0
+
+    def lookup(self, file_path: str, file_stat: os.stat_result) -> dict | None:
+        """
+        Returns the tags last read from a file, or None if it is not indexed or has changed.
+
+        :param file_path: Path of the audio file.
+        :param file_stat: Result of os.stat() for the file.
+        :return: Dict of the tags present in the file (absent tags are left out).
+        """
+        with self._lock:
+            row = self._fetch(file_path, file_stat, INDEX_TAGS)
+            if row is None:
+                return None
+
+            self.reused += 1
+            return {tag: value for tag, value in zip(INDEX_TAGS, row[1:]) if value is not None}
+
+    def lookup_written(self, file_path: str, file_stat: os.stat_result) -> dict | None:
+        """
+        Returns the tags last written to a file, or None if nothing was written or the file has changed since.
+
+        :param file_path: Path of the audio file.
+        :param file_stat: Result of os.stat() for the file.
+        """
+        with self._lock:
+            row = self._fetch(file_path, file_stat, tuple(f"written_{tag}" for tag in INDEX_TAGS))
+            if row is None or not row[0]:
+                return None
+
+            self.reused += 1
+            return {tag: value for tag, value in zip(INDEX_TAGS, row[1:]) if value is not None}
+
+    def store(self, file_path: str, file_stat: os.stat_result, tags: dict) -> None:
+        """
+        Records the tags read from a file.
+
+        :param file_path: Path of the audio file.
+        :param file_stat: Result of os.stat() taken *before* the file was read.
+        :param tags: Dict of tag name to value (missing tags are stored as NULL).
+        """
+        with self._lock:
+            self._write(file_path, file_stat, tags, written=False)
+
+    def store_written(self, file_path: str, file_stat: os.stat_result, tags: dict) -> None:
+        """
+        Records the tags just written to a file; they are also what a later read would return.
+
+        :param file_path: Path of the audio file.
+        :param file_stat: Result of os.stat() taken *after* the file was saved.
+        :param tags: Dict of tag name to value.
+        """
+        with self._lock:
+            self._write(file_path, file_stat, tags, written=True)
+
+    def rename(self, old_path: str, new_path: str) -> None:
+        """Moves an entry to a file's new path (a rename keeps size and mtime, so the entry stays valid)."""
+        with self._lock:
+            self._connection.execute("DELETE FROM tracks WHERE path = ?", (os.path.abspath(new_path),))
+            self._connection.execute("UPDATE tracks SET path = ? WHERE path = ?",
+                                     (os.path.abspath(new_path), os.path.abspath(old_path)))
+
+    def missing(self, tag: str, under: str | None = None) -> list[str]:
+        """
+        Lists indexed tracks that do not have a tag.
+
+        :param tag: One of INDEX_TAGS.
+        :param under: Optional directory; only tracks below it are listed.
+        :return: Sorted list of paths.
+        """
+        if tag not in INDEX_TAGS:
+            raise ValueError(f"Unknown tag '{tag}' (expected one of: {', '.join(INDEX_TAGS)})")
+
+        query, parameters = f"SELECT path FROM tracks WHERE ({tag} IS NULL OR {tag} = '')", ()
+        if under is not None:
+            prefix = os.path.join(os.path.abspath(under), "")
+            query += " AND substr(path, 1, ?) = ?"
+            parameters = (len(prefix), prefix)
+
+        with self._lock:
+            return [row[0] for row in self._connection.execute(query + " ORDER BY path", parameters)]
+
+    def stats(self) -> dict:
+        """Returns the number of indexed tracks, tracks written by meta-write and tracks missing each tag."""
+        missing = " ".join(f", SUM({tag} IS NULL OR {tag} = '')" for tag in INDEX_TAGS)
+        with self._lock:
+            row = self._connection.execute(f"SELECT COUNT(*), SUM(written){missing} FROM tracks").fetchone()
+
+        counts = {"tracks": row[0], "written": row[1] or 0}
+        counts.update({f"missing {tag}": value or 0 for tag, value in zip(INDEX_TAGS, row[2:])})
+        return counts
+
+    def prune(self) -> int:
+        """Removes entries for files that no longer exist and returns how many were removed."""
+        with self._lock:
+            paths = [row[0] for row in self._connection.execute("SELECT path FROM tracks")]
+            stale = [(path,) for path in paths if not os.path.exists(path)]
+            self._connection.executemany("DELETE FROM tracks WHERE path = ?", stale)
+            self._connection.commit()
+        return len(stale)
+
+    def flush(self) -> None:
+        """Commits pending entries without closing the database."""
+        with self._lock:
+            self._connection.commit()
+            self._pending_writes = 0
+
+    def clear(self) -> None:
+        """Removes every entry from the index."""
+        with self._lock:
+            self._connection.execute("DELETE FROM tracks")
+            self._connection.commit()
+
+    def close(self) -> None:
+        """Commits pending entries and closes the database."""
+        with self._lock:
+            self._connection.commit()
+            self._connection.close()
+
+def main():
+    """
+    Queries a library index without opening any audio file.
+
+    - Lists tracks missing a tag if --missing is given (optionally limited to a directory with --under).
+    - Prints track and missing-tag counts if --stats is given.
+    - Drops entries for deleted files if --prune is given.
+    """
+    parser = argparse.ArgumentParser(description="Query the music library index shared by music-renamer.py and meta-write.py.")
+    parser.add_argument("index", help="SQLite library index file.")
+    parser.add_argument("--missing", choices=INDEX_TAGS, help="List tracks that do not have this tag.")
+    parser.add_argument("--under", metavar="DIRECTORY", help="Only list tracks below this directory (with --missing).")
+    parser.add_argument("--stats", action="store_true", help="Print track and missing-tag counts.")
+    parser.add_argument("--prune", action="store_true", help="Remove entries for files that no longer exist.")
+
+    args = parser.parse_args()
+
+    if not os.path.isfile(os.path.expanduser(args.index)):
+        print(f"Error: Index '{args.index}' not found.")
+        return
+
+    library_index = LibraryIndex(args.index)
+    try:
+        if args.prune:
+            print(f"Removed {library_index.prune()} entries for missing files.")
+
+        if args.stats:
+            for label, count in library_index.stats().items():
+                print(f"{label:<20} {count}")
+
+        if args.missing:
+            for path in library_index.missing(args.missing, args.under):
+                print(path)
+    finally:
+        library_index.close()
+
+if __name__ == "__main__":
+    main()